@@ -1,10 +1,14 @@
 import argparse
+import contextlib
+import cProfile
 import importlib.metadata
+import inspect
 import json
 import logging
 import multiprocessing
 import os
 import pprint
+import shutil
 import sys
 import time
 import traceback
@@ -21,19 +25,33 @@ __path__ = extend_path(__path__, __name__)
 # because logging.setLoggerClass has to be called before logging.getLogger
 from pelican.log import console, DEFAULT_LOG_HANDLER  # noqa: I001
 from pelican.log import init as init_logging
+from pelican.cache import ContentStore, FileHashCache
 from pelican.generators import (
     ArticlesGenerator,
+    Generator,
     PagesGenerator,
     SourceFileGenerator,
     StaticGenerator,
     TemplatePagesGenerator,
+    create_template_environment,
 )
+from pelican import profiling
 from pelican.plugins import signals
 from pelican.plugins._utils import get_plugin_name, load_plugins
 from pelican.server import ComplexHTTPRequestHandler, RootedHTTPServer
 from pelican.settings import read_settings
-from pelican.utils import clean_output_dir, maybe_pluralize, wait_for_changes
-from pelican.writers import Writer
+from pelican.utils import (
+    FileIndex,
+    OutputCompressor,
+    clean_output_dir,
+    exchange_paths,
+    get_file_system_time,
+    link_tree,
+    maybe_pluralize,
+    prune_output_dir,
+    wait_for_changes,
+)
+from pelican.writers import ParallelWriter, Writer
 
 try:
     __version__ = importlib.metadata.version("pelican")
@@ -44,6 +62,24 @@ DEFAULT_CONFIG_NAME = "pelicanconf.py"
 logger = logging.getLogger(__name__)
 
 
+def _get_accepted_arguments(cls, arguments):
+    """Return the keyword arguments of the shared build state that the
+    generator class accepts
+
+    Generators of plugins that do not derive from Generator, or that do not
+    accept these arguments, are not given them.
+    """
+    if not (isinstance(cls, type) and issubclass(cls, Generator)):
+        return {}
+    try:
+        parameters = inspect.signature(cls).parameters
+    except (TypeError, ValueError):
+        return {}
+    if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values()):
+        return arguments
+    return {key: value for key, value in arguments.items() if key in parameters}
+
+
 class Pelican:
     def __init__(self, settings):
         """Pelican initialization
@@ -61,6 +97,10 @@ class Pelican:
         self.delete_outputdir = settings["DELETE_OUTPUT_DIRECTORY"]
         self.output_retention = settings["OUTPUT_RETENTION"]
 
+        # state kept between the builds of warm rebuilds
+        self._memory_caches = {} if settings["WARM_REBUILD"] else None
+        self._template_env = None
+
         self.init_path()
         self.init_plugins()
         signals.initialized.send(self)
@@ -91,6 +131,107 @@ class Pelican:
 
     def run(self):
         """Run the generators and return"""
+        with self._staged_output():
+            self._build()
+
+    @contextlib.contextmanager
+    def _staged_output(self):
+        """Make the build write to a staging directory if OUTPUT_STAGING is
+        True, then publish it in place of the output directory, unless the
+        build fails."""
+        staging_path = (
+            self._prepare_staging() if self.settings["OUTPUT_STAGING"] else None
+        )
+        if staging_path is None:
+            yield
+            return
+        output_path = self.output_path
+        self.output_path = self.settings["OUTPUT_PATH"] = staging_path
+        try:
+            yield
+        finally:
+            self.output_path = self.settings["OUTPUT_PATH"] = output_path
+        with profiling.timer("phases", "output publishing"):
+            self._publish_staging(staging_path)
+
+    def _staging_paths(self):
+        """Return the path of the output, and the path of the staging directory
+        the build is written to."""
+        output_path = os.path.normpath(os.path.abspath(self.output_path))
+        parent, name = os.path.split(output_path)
+        if not os.path.islink(output_path):
+            return output_path, os.path.join(parent, f".{name}.staging")
+        # the builds alternate between two directories, the output symbolic
+        # link pointing to the last one
+        current = os.path.realpath(output_path)
+        for suffix in ("a", "b"):
+            staging_path = os.path.join(parent, f".{name}.build-{suffix}")
+            if os.path.realpath(staging_path) != current:
+                return output_path, staging_path
+
+    def _prepare_staging(self):
+        """Create the staging directory, with hard links to the files of the
+        current output, and return its path, or None if the output cannot be
+        staged."""
+        output_path, staging_path = self._staging_paths()
+        source_path = os.path.realpath(self.path)
+        if os.path.commonpath(
+            [os.path.realpath(output_path), source_path]
+        ) == os.path.realpath(output_path):
+            logger.warning(
+                "OUTPUT_STAGING ignored: the output directory contains the "
+                "content directory"
+            )
+            return None
+        if not os.path.islink(output_path) and os.path.ismount(output_path):
+            # the staging directory, next to it, is on another file system
+            raise RuntimeError(
+                f"OUTPUT_STAGING cannot replace {output_path}, a mount point. "
+                "Make OUTPUT_PATH a symbolic link in the mounted directory "
+                "instead: the builds then alternate between two directories "
+                "next to the link."
+            )
+        with profiling.timer("phases", "output staging"):
+            # left by a failed build, or by the previous of the alternating
+            # builds
+            if os.path.lexists(staging_path):
+                shutil.rmtree(staging_path)
+            if not os.path.isdir(output_path):
+                os.makedirs(staging_path)
+            elif self.delete_outputdir and self.delete_outputdir != "prune":
+                # the staging directory is emptied but for OUTPUT_RETENTION
+                link_tree(output_path, staging_path, self.output_retention)
+            else:
+                link_tree(output_path, staging_path)
+        logger.debug("Writing the output to %s", staging_path)
+        return staging_path
+
+    def _publish_staging(self, staging_path):
+        """Replace the output directory with the staging directory."""
+        output_path = os.path.normpath(os.path.abspath(self.output_path))
+        parent, name = os.path.split(output_path)
+        if os.path.islink(output_path):
+            # replacing a symbolic link is atomic
+            temp_link = os.path.join(parent, f".{name}.link")
+            if os.path.lexists(temp_link):
+                os.unlink(temp_link)
+            os.symlink(os.path.basename(staging_path), temp_link)
+            os.replace(temp_link, output_path)
+        elif os.path.lexists(output_path) and exchange_paths(staging_path, output_path):
+            # the staging directory now holds the previous output
+            shutil.rmtree(staging_path, ignore_errors=True)
+        else:
+            # the output is missing between the two renames
+            previous_path = os.path.join(parent, f".{name}.previous")
+            if os.path.lexists(previous_path):
+                shutil.rmtree(previous_path)
+            if os.path.lexists(output_path):
+                os.rename(output_path, previous_path)
+            os.rename(staging_path, output_path)
+            shutil.rmtree(previous_path, ignore_errors=True)
+        logger.debug("Published %s as %s", staging_path, output_path)
+
+    def _build(self):
         start_time = time.time()
 
         context = self.settings.copy()
@@ -99,50 +240,109 @@ class Pelican:
         context["generated_content"] = {}
         context["static_links"] = set()
         context["static_content"] = {}
+        if self.settings["LAZY_CONTENT"]:
+            # the text of the content objects is kept on disk until needed
+            context["content_store"] = ContentStore()
         context["localsiteurl"] = self.settings["SITEURL"]
 
-        generators = [
-            cls(
-                context=context,
-                settings=self.settings,
-                path=self.path,
-                theme=self.theme,
-                output_path=self.output_path,
-            )
-            for cls in self._get_generator_classes()
-        ]
+        # The generators share one template environment, the caches kept for
+        # warm rebuilds, the index of the scanned directories and the digests
+        # of the source files; generators of plugins that do not derive from
+        # Generator may not accept them
+        with profiling.timer("phases", "initialization"):
+            env = self._template_env
+            if env is None:
+                env = create_template_environment(self.settings, self.theme)
+                if self._memory_caches is not None:
+                    self._template_env = env
+            # the files change between builds, so they are scanned again
+            file_index = FileIndex()
+            file_hashes = None
+            if self.settings["CHECK_MODIFIED_METHOD"] != "mtime":
+                try:
+                    file_hashes = FileHashCache(self.settings, self._memory_caches)
+                except AttributeError:
+                    pass  # the generators warn about unknown hashes
+            shared = {
+                "env": env,
+                "memory_caches": self._memory_caches,
+                "file_index": file_index,
+                "file_hashes": file_hashes,
+            }
+            generators = [
+                cls(
+                    context=context,
+                    settings=self.settings,
+                    path=self.path,
+                    theme=self.theme,
+                    output_path=self.output_path,
+                    **_get_accepted_arguments(cls, shared),
+                )
+                for cls in self._get_generator_classes()
+            ]
 
         # Delete the output directory if (1) the appropriate setting is True
         # and (2) that directory is not the parent of the source directory
-        if self.delete_outputdir and os.path.commonpath(
+        clean_output = self.delete_outputdir and os.path.commonpath(
             [os.path.realpath(self.output_path)]
         ) != os.path.commonpath(
             [os.path.realpath(self.output_path), os.path.realpath(self.path)]
-        ):
-            clean_output_dir(self.output_path, self.output_retention)
-
-        for p in generators:
-            if hasattr(p, "generate_context"):
-                p.generate_context()
-            if hasattr(p, "check_disabled_readers"):
-                p.check_disabled_readers()
+        )
+        if clean_output and self.delete_outputdir != "prune":
+            with profiling.timer("phases", "output cleaning"):
+                clean_output_dir(self.output_path, self.output_retention)
+        elif clean_output:
+            # the files changed from now on are kept by the pruning
+            prune_since = get_file_system_time(self.output_path)
+
+        with profiling.timer("phases", "context generation"):
+            for p in generators:
+                with profiling.timer(
+                    "generators", f"{p.__class__.__name__}.generate_context"
+                ):
+                    if hasattr(p, "generate_context"):
+                        p.generate_context()
+                    if hasattr(p, "check_disabled_readers"):
+                        p.check_disabled_readers()
+            if file_hashes is not None:
+                file_hashes.save_cache()
 
         # for plugins that create/edit the summary
         logger.debug("Signal all_generators_finalized.send(<generators>)")
-        signals.all_generators_finalized.send(generators)
+        with profiling.timer("phases", "all_generators_finalized"):
+            signals.all_generators_finalized.send(generators)
 
         # update links in the summary, etc
-        for p in generators:
-            if hasattr(p, "refresh_metadata_intersite_links"):
-                p.refresh_metadata_intersite_links()
+        with profiling.timer("phases", "links refresh"):
+            for p in generators:
+                if hasattr(p, "refresh_metadata_intersite_links"):
+                    p.refresh_metadata_intersite_links()
 
         writer = self._get_writer()
 
-        for p in generators:
-            if hasattr(p, "generate_output"):
-                p.generate_output(writer)
-
-        signals.finalized.send(self)
+        with profiling.timer("phases", "output generation"):
+            for p in generators:
+                if hasattr(p, "generate_output"):
+                    with profiling.timer(
+                        "generators", f"{p.__class__.__name__}.generate_output"
+                    ):
+                        p.generate_output(writer)
+
+        if isinstance(writer, Writer):
+            with profiling.timer("phases", "writer flush"):
+                writer.flush()
+
+        with profiling.timer("phases", "finalized"):
+            signals.finalized.send(self)
+
+        if clean_output and self.delete_outputdir == "prune":
+            with profiling.timer("phases", "output cleaning"):
+                self._prune_output(writer, generators, prune_since)
+        logger.debug(
+            "File index: %d of %d file stats served from the cache",
+            file_index.stat_hits,
+            file_index.stat_calls,
+        )
 
         articles_generator = next(
             g for g in generators if isinstance(g, ArticlesGenerator)
@@ -196,6 +396,43 @@ class Pelican:
             f"Done: Processed {pluralized_articles}, {pluralized_drafts}, {pluralized_hidden_articles}, {pluralized_pages}, {pluralized_hidden_pages} and {pluralized_draft_pages} in {time.time() - start_time:.2f} seconds."
         )
 
+        if isinstance(writer, Writer) and (
+            self.settings["SKIP_UNCHANGED_OUTPUT"]
+            or self.settings["INCREMENTAL_BUILD"]
+            or self.settings["WARM_REBUILD"]
+        ):
+            pluralized_written = maybe_pluralize(writer.files_written, "file", "files")
+            console.print(
+                f"Wrote {pluralized_written} and left {writer.files_unchanged} unchanged."
+            )
+
+    def _prune_output(self, writer, generators, since):
+        """Delete the files of the output directory that were not written by
+        this build (see DELETE_OUTPUT_DIRECTORY)."""
+        if not isinstance(writer, Writer):
+            logger.warning(
+                "Not pruning the output directory: the written files of the "
+                "%s writer are unknown",
+                writer.__class__.__name__,
+            )
+            return
+        keep = set(writer._written_files)
+        for generator in generators:
+            keep.update(getattr(generator, "output_paths", ()))
+        # only the compressed copies of the current OUTPUT_PRECOMPRESS
+        compressor = OutputCompressor(self.settings, threaded=False)
+        keep.update(
+            compressed_path
+            for path in list(keep)
+            for compressed_path in compressor.compressed_paths(path)
+        )
+        # files changed by this build but not recorded, such as those of
+        # plugins, are kept too
+        pruned = prune_output_dir(
+            self.output_path, keep, self.output_retention, since=since
+        )
+        logger.info("Deleted %d orphaned files from the output", pruned)
+
     def _get_generator_classes(self):
         discovered_generators = [
             (ArticlesGenerator, "internal"),
@@ -238,7 +475,12 @@ class Pelican:
         num_writers = len(writers)
 
         if num_writers == 0:
-            return Writer(self.output_path, settings=self.settings)
+            writer = ParallelWriter if self.settings["WRITER_WORKERS"] != 1 else Writer
+            return writer(
+                self.output_path,
+                settings=self.settings,
+                memory_caches=self._memory_caches,
+            )
 
         if num_writers > 1:
             logger.warning("%s writers found, using only first one", num_writers)
@@ -440,6 +682,39 @@ def parse_arguments(argv=None):
         help="Ignore content cache from previous runs by not loading cache files.",
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        help="Number of processes used to read content files and render "
+        "templates, and of threads used to copy static files. 0 means one "
+        "per CPU. (default: 1)",
+    )
+
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        action="store_true",
+        help="Print the time spent in each build phase, generator, reader, "
+        "template and plugin signal receiver, and build counters.",
+    )
+
+    parser.add_argument(
+        "--stats-json",
+        dest="stats_json",
+        metavar="PATH",
+        help="Write the timings and counters of --profile to a JSON file.",
+    )
+
+    parser.add_argument(
+        "--cprofile",
+        dest="cprofile",
+        metavar="PATH",
+        help="Profile the build with cProfile, and write the statistics to a "
+        "file that can be read with pstats or snakeviz.",
+    )
+
     parser.add_argument(
         "--fatal",
         metavar="errors|warnings",
@@ -533,6 +808,10 @@ def get_config(args):
         config["LOAD_CONTENT_CACHE"] = False
     if args.cache_path:
         config["CACHE_PATH"] = args.cache_path
+    if args.jobs is not None:
+        config["READER_WORKERS"] = args.jobs
+        config["WRITER_WORKERS"] = args.jobs
+        config["STATIC_WORKERS"] = args.jobs
     if args.relative_paths:
         config["RELATIVE_URLS"] = args.relative_paths
     if args.port is not None:
@@ -630,6 +909,28 @@ def listen(server, port, output, excqueue=None):
         raise
 
 
+def run_profiled(pelican, args):
+    """Run the build, with the profilers requested by the arguments"""
+    with contextlib.ExitStack() as stack:
+        profile = None
+        if args.profile or args.stats_json:
+            profile = stack.enter_context(profiling.profile_build())
+        if args.cprofile:
+            profiler = cProfile.Profile()
+            profiler.runcall(pelican.run)
+            profiler.dump_stats(args.cprofile)
+            logger.info("cProfile statistics written to %s", args.cprofile)
+        else:
+            pelican.run()
+
+    if profile is not None:
+        if args.profile:
+            console.print(profile.format(), markup=False, highlight=False)
+        if args.stats_json:
+            profiling.write_report(profile, args.stats_json)
+            logger.info("Build statistics written to %s", args.stats_json)
+
+
 def main(argv=None):
     args = parse_arguments(argv)
     logs_dedup_min_level = getattr(logging, args.logs_dedup_min_level)
@@ -676,7 +977,7 @@ def main(argv=None):
             )
         else:
             with console.status("Generating..."):
-                pelican.run()
+                run_profiled(pelican, args)
     except KeyboardInterrupt:
         logger.warning("Keyboard interrupt received. Exiting.")
     except Exception as e:
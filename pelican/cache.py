@@ -1,35 +1,435 @@
+import datetime
+import decimal
+import enum
+import fnmatch
+import fractions
+import functools
 import gzip
 import hashlib
+import importlib.metadata
+import io
+import itertools
 import logging
 import os
+import pathlib
 import pickle
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zlib
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = False
+
+from pelican.contents import Content
+from pelican.plugins._utils import get_plugin_name
+from pelican.urlwrappers import URLWrapper
 from pelican.utils import mkdir_p
 
 logger = logging.getLogger(__name__)
 
 
+class SharedObjectPickler(pickle.Pickler):
+    """Pickler that does not serialize some shared objects.
+
+    Content and its metadata (URL wrappers, mostly) keep references to the
+    settings and the context, which may hold objects that cannot be pickled,
+    and would be serialized again for every pickled entry. *shared* maps names
+    to such objects; the receiving side restores the references with
+    :class:`SharedObjectUnpickler`.
+    """
+
+    def __init__(self, file, shared):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._shared_ids = {id(obj): name for name, obj in shared.items()}
+
+    def persistent_id(self, obj):
+        return self._shared_ids.get(id(obj))
+
+
+class SharedObjectUnpickler(pickle.Unpickler):
+    def __init__(self, file, shared):
+        super().__init__(file)
+        self._shared = shared
+
+    def persistent_load(self, pid):
+        try:
+            return self._shared[pid]
+        except KeyError:
+            raise pickle.UnpicklingError(f"Unsupported persistent id: {pid}") from None
+
+
+# errors raised when unpickling data that is corrupted, or that refers to
+# classes that were renamed or removed
+_UNPICKLING_ERRORS = (
+    pickle.PickleError,
+    EOFError,
+    AttributeError,
+    ImportError,
+    IndexError,
+    TypeError,
+    ValueError,
+)
+
+
+class SQLiteCacheStore:
+    """Store of cache entries in an SQLite database, one row per file
+
+    Entries are only read when they are requested, and only the given
+    entries are written, so the cost of a build does not grow with the size
+    of the whole cache.
+    """
+
+    def __init__(self, path, shared, compress, fingerprint, load=True):
+        """*shared* objects are not pickled with the entries (see
+        :class:`SharedObjectPickler`), entries are compressed with zlib if
+        *compress* is True, and the existing entries are neither loaded nor
+        kept if *load* is False, or if they were saved with another
+        *fingerprint*."""
+        self._path = path
+        self._shared = shared
+        self._compress = compress
+        self._fingerprint = fingerprint
+        self._load = load
+        self._fingerprint_checked = False
+        self._connection = None
+        self._connection_pid = None
+
+    def _connect(self):
+        # a connection cannot be used by forked (reader worker) processes
+        if self._connection is None or self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(self._path)
+            self._connection_pid = os.getpid()
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(filename TEXT PRIMARY KEY, data BLOB NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS header (fingerprint TEXT NOT NULL)"
+            )
+        return self._connection
+
+    def _check_fingerprint(self, connection):
+        if not self._fingerprint_checked:
+            self._fingerprint_checked = True
+            row = connection.execute("SELECT fingerprint FROM header").fetchone()
+            if row is None or row[0] != self._fingerprint:
+                logger.info(
+                    "Ignoring cache %s, the settings, plugins or "
+                    "libraries have changed since it was saved",
+                    self._path,
+                )
+                self._load = False
+
+    def load(self, filename):
+        """Return the entry for filename, raise KeyError if there is none"""
+        if not self._load or not os.path.isfile(self._path):
+            raise KeyError(filename)
+        try:
+            connection = self._connect()
+            self._check_fingerprint(connection)
+            if not self._load:
+                raise KeyError(filename)
+            row = connection.execute(
+                "SELECT data FROM entries WHERE filename = ?", (filename,)
+            ).fetchone()
+        except sqlite3.Error as err:
+            logger.warning(
+                "Cannot read cache %s, proceeding with empty cache.\n%s",
+                self._path,
+                err,
+            )
+            self._load = False
+            raise KeyError(filename) from err
+        if row is None:
+            raise KeyError(filename)
+
+        data = row[0]
+        try:
+            if self._compress:
+                data = zlib.decompress(data)
+            return SharedObjectUnpickler(io.BytesIO(data), self._shared).load()
+        except (zlib.error, *_UNPICKLING_ERRORS) as err:
+            # e.g. GZIP_CACHE was changed, another version of Python wrote the
+            # entry, or a class of the entry was renamed or removed
+            logger.debug("Cannot load cache entry for %s\n%s", filename, err)
+            raise KeyError(filename) from err
+
+    def count(self):
+        """Return the number of entries that can be loaded"""
+        if not self._load or not os.path.isfile(self._path):
+            return 0
+        try:
+            connection = self._connect()
+            self._check_fingerprint(connection)
+            if not self._load:
+                return 0
+            return connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def save(self, entries, keep=None):
+        """Write the entries of the entries dictionary
+
+        The other entries are kept if their file name is in *keep* (all of
+        them if it is None), unless the existing entries were not loaded.
+        """
+        if self._load and os.path.isfile(self._path):
+            try:
+                self._check_fingerprint(self._connect())
+            except sqlite3.Error:
+                self._load = False
+        if not self._load:
+            self.close()
+            if os.path.isfile(self._path):
+                os.remove(self._path)
+            self._load = True
+
+        rows = []
+        for filename, value in entries.items():
+            buffer = io.BytesIO()
+            SharedObjectPickler(buffer, self._shared).dump(value)
+            data = buffer.getvalue()
+            if self._compress:
+                data = zlib.compress(data)
+            rows.append((filename, data))
+
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM header")
+            connection.execute(
+                "INSERT INTO header (fingerprint) VALUES (?)", (self._fingerprint,)
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO entries (filename, data) VALUES (?, ?)", rows
+            )
+            if keep is not None:
+                connection.execute(
+                    "CREATE TEMPORARY TABLE IF NOT EXISTS keep "
+                    "(filename TEXT PRIMARY KEY)"
+                )
+                connection.execute("DELETE FROM keep")
+                connection.executemany(
+                    "INSERT OR IGNORE INTO keep (filename) VALUES (?)",
+                    ((filename,) for filename in keep),
+                )
+                connection.execute(
+                    "DELETE FROM entries WHERE filename NOT IN "
+                    "(SELECT filename FROM keep)"
+                )
+
+    def close(self):
+        if self._connection is not None and self._connection_pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+
+class ContentStore:
+    """Store of the text of content objects in a temporary file, which
+    content objects load it from when needed (see LAZY_CONTENT)
+
+    The file is removed once the store is garbage collected. Forked processes,
+    such as worker processes, can read the texts stored before they were
+    forked, and store texts in a file of their own.
+    """
+
+    def __init__(self):
+        # (first offset, file) of the files of the texts, the last one being
+        # written by this process
+        self._files = [(0, tempfile.TemporaryFile())]
+        self._size = 0
+        self._pid = os.getpid()
+        # without positional reads, reads and writes must not interleave
+        self._lock = threading.Lock()
+
+    def put(self, text):
+        """Store a text and return its handle"""
+        data = text.encode("utf-8", "surrogatepass")
+        with self._lock:
+            if self._pid != os.getpid():
+                # forked: the file is still written by the parent process
+                self._pid = os.getpid()
+                self._files.append((self._size, tempfile.TemporaryFile()))
+            start, file = self._files[-1]
+            offset = self._size
+            self._size += len(data)
+            if hasattr(os, "pwrite"):
+                os.pwrite(file.fileno(), data, offset - start)
+            else:
+                file.seek(offset - start)
+                file.write(data)
+                file.flush()
+        return offset, len(data)
+
+    def get(self, handle):
+        """Return the text of a handle returned by put()"""
+        offset, length = handle
+        start, file = next(f for f in reversed(self._files) if f[0] <= offset)
+        if hasattr(os, "pread"):
+            data = os.pread(file.fileno(), length, offset - start)
+        else:
+            with self._lock:
+                file.seek(offset - start)
+                data = file.read(length)
+        return data.decode("utf-8", "surrogatepass")
+
+    def __reduce__(self):
+        # pickled content objects hold their text (see Content.__getstate__),
+        # so an empty store is restored
+        return (self.__class__, ())
+
+
+class _UnstableValue(Exception):
+    """A value has no fingerprint that can be compared between builds."""
+
+
+@functools.cache
+def _get_library_version(name):
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def get_hash_function(name):
+    """Return the hash constructor named *name* (see CHECK_MODIFIED_METHOD)
+
+    The name is looked up in hashlib, then in the xxhash package if it is
+    installed. Raise AttributeError if there is no such hash.
+    """
+    if hasattr(hashlib, name) or not (xxhash and name.startswith("xxh")):
+        return getattr(hashlib, name)
+    return getattr(xxhash, name)
+
+
 class FileDataCacher:
     """Class that can cache data contained in files"""
 
-    def __init__(self, settings, cache_name, caching_policy, load_policy):
+    # storage of the cache, "pickle" or "sqlite"; CACHE_STORAGE if None
+    _cache_storage = None
+
+    # settings that change how the site is built, not what is built
+    _build_settings = frozenset(
+        (
+            "CACHE_CONTENT",
+            "CACHE_PATH",
+            "CHECK_MODIFIED_METHOD",
+            "CONTENT_CACHING_LAYER",
+            "DELETE_OUTPUT_DIRECTORY",
+            "GZIP_CACHE",
+            "INCREMENTAL_BUILD",
+            "JINJA_BYTECODE_CACHE",
+            "LAZY_CONTENT",
+            "LOAD_CONTENT_CACHE",
+            "OUTPUT_PATH",
+            "OUTPUT_PRECOMPRESS",
+            "OUTPUT_PRECOMPRESS_EXTENSIONS",
+            "OUTPUT_RETENTION",
+            "OUTPUT_STAGING",
+            "READER_WORKERS",
+            "SKIP_UNCHANGED_OUTPUT",
+            "STATIC_WORKERS",
+            "STREAM_OUTPUT",
+            "WARM_REBUILD",
+            "WRITER_WORKERS",
+        )
+    )
+
+    # patterns (see fnmatch) of the settings the cached data depends on; if
+    # None, all the settings but the _build_settings
+    _fingerprinted_settings = None
+
+    # libraries whose version may change what readers return
+    _reader_libraries = (
+        "pelican",
+        "docutils",
+        "markdown",
+        "pygments",
+        "smartypants",
+        "typogrify",
+    )
+
+    # types of values, other than the builtin ones, with a repr that can be
+    # compared between builds
+    _repr_types = (
+        complex,
+        datetime.timedelta,
+        datetime.tzinfo,
+        decimal.Decimal,
+        enum.Enum,
+        fractions.Fraction,
+        pathlib.PurePath,
+        re.Pattern,
+        uuid.UUID,
+    )
+
+    def __init__(self, settings, cache_name, caching_policy, load_policy, memory=None):
         """Load the specified cache within CACHE_PATH in settings
 
         only if *load_policy* is True,
         May use gzip if GZIP_CACHE ins settings is True.
         Sets caching policy according to *caching_policy*.
+
+        If CACHE_STORAGE is "sqlite", the entries are stored separately and
+        only loaded when requested.
+
+        The cache is not loaded if it was saved with other settings, plugins
+        or reader libraries (see _get_cache_fingerprint).
+
+        *memory* is a dictionary keeping the caches between the builds of a
+        process (see WARM_REBUILD). A cache found there is used instead of
+        the saved one, and data is always cached there, even if it is not
+        saved according to the caching policy.
         """
         self.settings = settings
+        self._cache_name = cache_name
         self._cache_path = os.path.join(self.settings["CACHE_PATH"], cache_name)
         self._cache_data_policy = caching_policy
+        self._memory = memory
         if self.settings["GZIP_CACHE"]:
             self._cache_open = gzip.open
         else:
             self._cache_open = open
-        if load_policy:
+        self._cache = {}
+        self._dirty = set()
+        self._fingerprints = {}
+        self._cache_fingerprint = self._get_cache_fingerprint()
+        self._store = None
+        memorized = memory.get(cache_name) if memory is not None else None
+        if memorized is not None and memorized[0] == self._cache_fingerprint:
+            # not shared with the memory until saved (see _pack)
+            self._cache = dict(memorized[1])
+        else:
+            memorized = None
+        storage = self._cache_storage or self.settings["CACHE_STORAGE"]
+        if storage == "sqlite":
+            self._store = SQLiteCacheStore(
+                self._cache_path + ".sqlite",
+                shared=self._cache_shared_objects(),
+                compress=self.settings["GZIP_CACHE"],
+                fingerprint=self._cache_fingerprint,
+                load=load_policy,
+            )
+        elif load_policy and memorized is None:
             try:
                 with self._cache_open(self._cache_path, "rb") as fhandle:
-                    self._cache = pickle.load(fhandle)
+                    cache = pickle.load(fhandle)
+                if not isinstance(cache, tuple) or cache[0] != self._cache_fingerprint:
+                    logger.info(
+                        "Ignoring cache %s, the settings, plugins or "
+                        "libraries have changed since it was saved",
+                        self._cache_path,
+                    )
+                else:
+                    self._cache = {
+                        key: self._pack(data) for key, data in cache[1].items()
+                    }
             except (OSError, UnicodeDecodeError) as err:
                 logger.debug(
                     "Cannot load cache %s (this is normal on first "
@@ -38,7 +438,7 @@ class FileDataCacher:
                     err,
                 )
                 self._cache = {}
-            except pickle.PickleError as err:
+            except _UNPICKLING_ERRORS as err:
                 logger.warning(
                     "Cannot unpickle cache %s, cache may be using "
                     "an incompatible protocol (see pelican "
@@ -48,61 +448,244 @@ class FileDataCacher:
                     err,
                 )
                 self._cache = {}
+
+    def _get_settings_fingerprint(self):
+        """Fingerprint the settings that change the cached data (see
+        _fingerprinted_settings)"""
+        if self._fingerprinted_settings is None:
+            keys = [key for key in self.settings if key not in self._build_settings]
         else:
-            self._cache = {}
+            keys = [
+                key
+                for key in self.settings
+                if any(
+                    fnmatch.fnmatchcase(key, pattern)
+                    for pattern in self._fingerprinted_settings
+                )
+            ]
+        return self._fingerprint(
+            {key: self.settings[key] for key in sorted(keys)}, deep=False
+        )
+
+    def _get_cache_fingerprint(self):
+        """Fingerprint everything the cached data depends on, other than
+        the cached files: the settings, the plugins and the libraries used
+        by readers
+
+        A cache built with another fingerprint is not loaded.
+        """
+        plugins = []
+        for plugin in self.settings.get("PLUGINS") or ():
+            module = sys.modules.get(plugin) if isinstance(plugin, str) else plugin
+            version = getattr(module, "__version__", None)
+            if version is None and getattr(module, "__file__", None):
+                # unversioned (local) plugins are identified by their stamp
+                try:
+                    stat = os.stat(module.__file__)
+                    version = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    pass
+            plugins.append((get_plugin_name(plugin), version))
+        libraries = [
+            (name, _get_library_version(name)) for name in self._reader_libraries
+        ]
+        return hashlib.blake2b(
+            self._get_settings_fingerprint()
+            + self._fingerprint((plugins, libraries), deep=False),
+            digest_size=16,
+        ).hexdigest()
+
+    def _cache_shared_objects(self):
+        """Return the objects referenced by the cached data that are not
+        stored with each entry, by name"""
+        return {"settings": self.settings}
+
+    def _pack(self, data):
+        """Return the data of a file as kept in the cache until it is saved,
+        such as with texts kept on disk (see Readers)"""
+        return data
+
+    def _unpack(self, data):
+        """Return the data of a file from the form returned by _pack()"""
+        return data
 
     def cache_data(self, filename, data):
         """Cache data for given file"""
+        if self._cache_data_policy or self._memory is not None:
+            self._cache[filename] = self._pack(data)
         if self._cache_data_policy:
-            self._cache[filename] = data
+            self._dirty.add(filename)
 
     def get_cached_data(self, filename, default=None):
         """Get cached data for the given file
 
         if no data is cached, return the default object
         """
-        return self._cache.get(filename, default)
+        if filename not in self._cache:
+            if self._store is None:
+                return default
+            try:
+                self._cache[filename] = self._pack(self._store.load(filename))
+            except KeyError:
+                return default
+        return self._unpack(self._cache[filename])
 
     def save_cache(self):
         """Save the updated cache"""
-        if self._cache_data_policy:
+        cache = None
+        if self._memory is not None:
+            cache = {key: self._unpack(data) for key, data in self._cache.items()}
+            self._memory[self._cache_name] = (self._cache_fingerprint, cache)
+        # the entries of the files that were not used by this build (e.g.
+        # that were removed) are not kept by the SQLite storage
+        if self._cache_data_policy and (
+            self._dirty
+            or (self._store is not None and self._store.count() > len(self._cache))
+        ):
             try:
                 mkdir_p(self.settings["CACHE_PATH"])
-                with self._cache_open(self._cache_path, "wb") as fhandle:
-                    pickle.dump(self._cache, fhandle)
-            except (OSError, pickle.PicklingError, TypeError) as err:
+                if self._store is not None:
+                    self._store.save(
+                        {key: self._unpack(self._cache[key]) for key in self._dirty},
+                        keep=self._cache,
+                    )
+                    self._store.close()
+                else:
+                    if cache is None:
+                        cache = {
+                            key: self._unpack(data) for key, data in self._cache.items()
+                        }
+                    with self._cache_open(self._cache_path, "wb") as fhandle:
+                        pickle.dump((self._cache_fingerprint, cache), fhandle)
+                self._dirty.clear()
+            except (
+                OSError,
+                sqlite3.Error,
+                pickle.PicklingError,
+                TypeError,
+            ) as err:
                 logger.warning(
                     "Could not save cache %s\n ... %s", self._cache_path, err
                 )
 
+    def _get_fingerprint(self, value, deep=False, strict=False):
+        # memoized values are kept alive, so that their ids are not reused
+        memo = self._fingerprints.get((id(value), deep, strict))
+        if memo is not None and memo[0] is value:
+            return memo[1]
+        return None
+
+    def _set_fingerprint(self, value, fingerprint, deep=False, strict=False):
+        self._fingerprints[id(value), deep, strict] = (value, fingerprint)
+        return fingerprint
+
+    def _fingerprint(self, value, deep, strict=False):
+        """Return the fingerprint of a value
+
+        With deep=False, content objects are only fingerprinted by their
+        location, title, metadata and summary; with deep=True, their whole
+        text is fingerprinted too. Values that cannot be compared between
+        builds raise _UnstableValue if deep or strict is True, and are
+        fingerprinted by their type otherwise.
+        """
+        if value is None or isinstance(
+            value, str | bytes | int | float | datetime.date | datetime.time
+        ):
+            return f"{type(value).__name__}:{value!r}".encode()
+        if isinstance(value, type) or callable(value):
+            name = getattr(value, "__qualname__", type(value).__qualname__)
+            return f"{getattr(value, '__module__', '')}.{name}".encode()
+        if isinstance(value, URLWrapper):
+            return f"{type(value).__name__}:{value.name!r}:{value.slug!r}".encode()
+
+        if isinstance(value, list | tuple | set | frozenset | dict | Content):
+            fingerprint = self._get_fingerprint(value, deep, strict)
+            if fingerprint is None:
+                hash_ = hashlib.blake2b(type(value).__name__.encode(), digest_size=16)
+                for part in self._fingerprint_parts(value, deep, strict):
+                    hash_.update(len(part).to_bytes(4, "little"))
+                    hash_.update(part)
+                fingerprint = self._set_fingerprint(value, hash_.digest(), deep, strict)
+            return fingerprint
+
+        if isinstance(value, self._repr_types):
+            return f"{type(value).__name__}:{value!r}".encode()
+        if deep or strict:
+            raise _UnstableValue(type(value).__qualname__)
+        return f"{type(value).__module__}.{type(value).__qualname__}".encode()
+
+    def _fingerprint_parts(self, value, deep, strict):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                yield self._fingerprint(key, deep, strict)
+                yield self._fingerprint(item, deep, strict)
+        elif isinstance(value, set | frozenset):
+            yield from sorted(self._fingerprint(item, deep, strict) for item in value)
+        elif isinstance(value, Content):
+            for attr in ("source_path", "url", "save_as", "title", "status", "lang"):
+                yield self._fingerprint(getattr(value, attr, None), deep=False)
+            # pages may show the metadata and summary of any content (e.g. in
+            # a list of recent articles)
+            yield self._fingerprint(value.metadata, deep, strict)
+            text = value._content
+            if deep:
+                yield self._fingerprint(text, deep)
+            elif text and "summary" not in value.metadata:
+                # the summary before its links are resolved, which would have
+                # side effects ({attach} links)
+                yield self._fingerprint(value._summarize(text), deep=False)
+        else:
+            for item in value:
+                yield self._fingerprint(item, deep, strict)
+
 
 class FileStampDataCacher(FileDataCacher):
     """Subclass that also caches the stamp of the file"""
 
-    def __init__(self, settings, cache_name, caching_policy, load_policy):
+    def __init__(
+        self,
+        settings,
+        cache_name,
+        caching_policy,
+        load_policy,
+        memory=None,
+        stat=os.stat,
+        file_hashes=None,
+    ):
         """This subclass additionally sets filestamp function
         and base path for filestamping operations
+
+        *stat* is the function used to get the modification time of files,
+        such as the stat method of a FileIndex. *file_hashes* is the
+        FileHashCache used to get the digests of files, if any.
         """
 
-        super().__init__(settings, cache_name, caching_policy, load_policy)
+        super().__init__(settings, cache_name, caching_policy, load_policy, memory)
 
+        self._stat = stat
+        self._file_hashes = file_hashes
         method = self.settings["CHECK_MODIFIED_METHOD"]
         if method == "mtime":
-            self._filestamp_func = os.path.getmtime
+            self._filestamp_func = self._get_mtime
         else:
             try:
-                hash_func = getattr(hashlib, method)
+                hash_func = get_hash_function(method)
 
                 def filestamp_func(filename):
                     """return hash of file contents"""
+                    if file_hashes is not None:
+                        return file_hashes.get_digest(filename, self._stat)
                     with open(filename, "rb") as fhandle:
-                        return hash_func(fhandle.read()).digest()
+                        return hashlib.file_digest(fhandle, hash_func).digest()
 
                 self._filestamp_func = filestamp_func
             except AttributeError as err:
                 logger.warning("Could not get hashing function\n\t%s", err)
                 self._filestamp_func = None
 
+    def _get_mtime(self, filename):
+        return self._stat(filename).st_mtime
+
     def cache_data(self, filename, data):
         """Cache stamp and data for the given file"""
         stamp = self._get_file_stamp(filename)
@@ -134,6 +717,205 @@ class FileStampDataCacher(FileDataCacher):
         """
 
         stamp, data = super().get_cached_data(filename, (None, default))
-        if stamp != self._get_file_stamp(filename):
+        if stamp is None or stamp != self._get_file_stamp(filename):
             return default
         return data
+
+
+class FileHashCache(FileDataCacher):
+    """Cache of the digests of the source files, for the hashes of
+    CHECK_MODIFIED_METHOD
+
+    It is shared by the cache layers of a build (see Pelican.run), so that
+    each file is hashed at most once by build, and saved in CACHE_PATH, so
+    that a file is only hashed again once its inode, size or modification
+    time changed.
+    """
+
+    # the digests are small, and loaded as a whole by every build
+    _cache_storage = "pickle"
+
+    # the digests of files modified less than this many seconds before they
+    # were hashed are not reused by later builds, as the file may be
+    # modified again without its modification time changing
+    _racy_delay = 2
+
+    def __init__(self, settings, memory=None):
+        super().__init__(
+            settings,
+            "file_hashes",
+            caching_policy=settings["CACHE_CONTENT"],
+            load_policy=settings["CACHE_CONTENT"] and settings["LOAD_CONTENT_CACHE"],
+            memory=memory,
+        )
+        self._hash_func = get_hash_function(settings["CHECK_MODIFIED_METHOD"])
+        # filename -> (stamp, digest) of the files hashed by this build
+        self._digests = {}
+        # number of digests already returned by collect_digests()
+        self._collected = 0
+
+    def _get_cache_fingerprint(self):
+        # the digests only depend on the hash
+        return self.settings["CHECK_MODIFIED_METHOD"]
+
+    def get_digest(self, filename, stat=os.stat):
+        """Return the digest of a file, hashing it only if needed
+
+        *stat* is the function used to get the stamp of the file, such as
+        the stat method of a FileIndex.
+        """
+        filename = os.path.normpath(filename)
+        file_stat = stat(filename)
+        stamp = (
+            file_stat.st_dev,
+            file_stat.st_ino,
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+        )
+        for cached_stamp, digest in (
+            self._digests.get(filename, (None, None)),
+            self.get_cached_data(filename, (None, None)),
+        ):
+            if cached_stamp == stamp:
+                return digest
+
+        with open(filename, "rb") as fhandle:
+            digest = hashlib.file_digest(fhandle, self._hash_func).digest()
+        self._add_digest(filename, stamp, digest)
+        return digest
+
+    def _add_digest(self, filename, stamp, digest):
+        self._digests[filename] = (stamp, digest)
+        if time.time() - stamp[3] / 1e9 > self._racy_delay:
+            self.cache_data(filename, (stamp, digest))
+
+    def collect_digests(self):
+        """Return the digests computed since the previous call, as a
+        dictionary of filename -> (stamp, digest)
+
+        Used by reader worker processes, to send the digests they computed
+        to the main process (see add_digests).
+        """
+        digests = dict(itertools.islice(self._digests.items(), self._collected, None))
+        self._collected = len(self._digests)
+        return digests
+
+    def add_digests(self, digests):
+        """Add the digests computed by another process (see
+        collect_digests)"""
+        for filename, (stamp, digest) in digests.items():
+            self._add_digest(filename, stamp, digest)
+
+
+class BuildManifest(FileDataCacher):
+    """Cache of the signatures of the inputs of the output files
+
+    An output file whose signature did not change since the previous
+    build does not need to be written again. The signature covers the
+    settings, the templates, the structure of the site (URLs, titles and
+    taxonomies of all the content) and the full content of the objects
+    passed to the template.
+    """
+
+    # the manifest is small, and replaced as a whole by every build
+    _cache_storage = "pickle"
+
+    # context values that do not change the output files: the site URL is
+    # fingerprinted with the settings, and the content store holds the texts
+    # of the content objects
+    _unsigned_context = frozenset(("content_store", "localsiteurl"))
+
+    def __init__(self, settings, memory=None, output_path=None):
+        """The manifest is saved with INCREMENTAL_BUILD or
+        SKIP_UNCHANGED_OUTPUT, and only kept in *memory* otherwise (see
+        FileDataCacher). With SKIP_UNCHANGED_OUTPUT alone, it is loaded even
+        if LOAD_CONTENT_CACHE is False. The output files are recorded by
+        their path relative to *output_path*, if given, so that the output
+        can be written to another directory (see OUTPUT_STAGING)."""
+        self._output_path = output_path
+        if settings["INCREMENTAL_BUILD"]:
+            saved, load = True, settings["LOAD_CONTENT_CACHE"]
+        else:
+            # only the record of the overridden outputs is used, which cannot
+            # make the output wrong (see Writer._write_file)
+            saved = load = settings["SKIP_UNCHANGED_OUTPUT"]
+        super().__init__(
+            settings,
+            "build_manifest",
+            caching_policy=saved,
+            load_policy=load,
+            memory=memory,
+        )
+        # Only the outputs of the current build are saved.
+        self._previous, self._cache = self._cache, {}
+        self._settings_fingerprint = self._get_settings_fingerprint()
+
+    def get_signature(self, template, context, inputs, listings=None):
+        """Return the signature of the inputs of an output file
+
+        template is the template rendered to the file (if any), context the
+        shared context, and inputs a dictionary of the other inputs. Like
+        the content objects of the context, those of the listings dictionary
+        are only fingerprinted by their location, title, metadata and
+        summary (not by the other attributes plugins may set). Return None if
+        some of the inputs cannot be compared between builds, in which case
+        the output is always written.
+        """
+        hash_ = hashlib.blake2b(self._settings_fingerprint, digest_size=16)
+        try:
+            if template is not None:
+                hash_.update(self._template_fingerprint(template))
+            for key, value in context.items():
+                if key in self._unsigned_context or self.settings.get(key) is value:
+                    continue
+                hash_.update(self._fingerprint((key, value), deep=False, strict=True))
+            for key in sorted(inputs):
+                hash_.update(self._fingerprint((key, inputs[key]), deep=True))
+            for key in sorted(listings or ()):
+                hash_.update(
+                    self._fingerprint((key, listings[key]), deep=False, strict=True)
+                )
+        except _UnstableValue:
+            return None
+        return hash_.hexdigest()
+
+    def _key(self, path):
+        if self._output_path is None:
+            return path
+        return os.path.relpath(path, self._output_path)
+
+    def cache_data(self, filename, data):
+        """Record the signature of an output file, and whether it was
+        written by an overriding write, as a (signature, override) tuple"""
+        super().cache_data(self._key(filename), data)
+
+    def is_up_to_date(self, path, signature):
+        """Return True if path was written from the same inputs by the
+        previous build"""
+        return (
+            signature is not None
+            and self._previous.get(self._key(path), (None, False))[0] == signature
+            and os.path.isfile(path)
+        )
+
+    def was_overridden(self, path):
+        """Return True if path was written by an overriding write in the
+        previous build"""
+        return self._previous.get(self._key(path), (None, False))[1]
+
+    def _template_fingerprint(self, template):
+        """Fingerprint the name of the template, and the sources of all the
+        templates of its environment (it may extend or include any of them)"""
+        env = template.environment
+        hash_ = self._get_fingerprint(env)
+        if hash_ is None:
+            hash_ = hashlib.blake2b(digest_size=16)
+            try:
+                names = sorted(env.list_templates())
+            except TypeError as err:  # a loader cannot list its templates
+                raise _UnstableValue from err
+            for name in names:
+                source, _, _ = env.loader.get_source(env, name)
+                hash_.update(self._fingerprint((name, source), deep=False))
+            hash_ = self._set_fingerprint(env, hash_.digest())
+        return hash_ + str(template.name).encode()
@@ -1,5 +1,6 @@
 import copy
 import datetime
+import functools
 import locale
 import logging
 import os
@@ -35,6 +36,21 @@ from pelican.utils import (
 logger = logging.getLogger(__name__)
 
 
+_TAXONOMY_CLASSES = {"category": Category, "tag": Tag, "author": Author}
+
+
+@functools.lru_cache
+def _compile_intrasite_link_regex(intrasite_link_regex: str) -> re.Pattern:
+    regex = rf"""
+        (?P<markup><[^\>]+  # match tag with all url-value attributes
+            (?:href|src|poster|data|cite|formaction|action|content)\s*=\s*)
+
+        (?P<quote>["\'])      # require value to be quoted
+        (?P<path>{intrasite_link_regex}(?P<value>.*?))  # the url value
+        (?P=quote)"""
+    return re.compile(regex, re.X)
+
+
 class Content:
     """Represents a content.
 
@@ -49,6 +65,16 @@ class Content:
     default_template: str | None = None
     mandatory_properties: tuple[str, ...] = ()
 
+    # the settings of the last memoized taxonomy URLs, and these URLs by
+    # (what, name) (see _get_taxonomy_url)
+    _taxonomy_urls: tuple[dict | None, dict[tuple[str, str], str]] = (None, {})
+
+    # the text of the content, or the store and handle it can be loaded with
+    # (see LAZY_CONTENT)
+    _content_text: str | None = None
+    _content_store = None
+    _content_handle: tuple[int, int] | None = None
+
     @deprecated_attribute(old="filename", new="source_path", since=(3, 2, 0))
     def filename():
         return None
@@ -67,10 +93,10 @@ class Content:
             settings = copy.deepcopy(DEFAULT_CONFIG)
 
         self.settings = settings
-        self._content = content
         if context is None:
             context = {}
         self._context = context
+        self._content = content
         self.translations = []
 
         local_metadata = {}
@@ -169,6 +195,50 @@ class Content:
     def __str__(self) -> str:
         return self.source_path or repr(self)
 
+    @property
+    def _content(self) -> str:
+        if self._content_handle is not None:
+            return self._content_store.get(self._content_handle)
+        return self._content_text
+
+    @_content.setter
+    def _content(self, value: str) -> None:
+        # with LAZY_CONTENT, the text is kept on disk, and only loaded when
+        # needed
+        store = self._context.get("content_store")
+        if store is not None and isinstance(value, str) and value:
+            self._content_store = store
+            self._content_handle = store.put(value)
+            self._content_text = None
+        else:
+            self._content_store = self._content_handle = None
+            self._content_text = value
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        if self._content_handle is not None:
+            # the store is a temporary file of the current build
+            state["_content_text"] = self._content
+            del state["_content_store"], state["_content_handle"]
+            state.pop("_content_siteurls", None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if "_context" in state and self._content_text is not None:
+            # stored again in the store of the current build, if any
+            self._content = self._content_text
+
+    def evict_content(self) -> None:
+        """Forget the versions of the text returned by get_content(), if the
+        text is kept on disk (see LAZY_CONTENT): they are built again from it
+        if needed."""
+        if self._content_handle is None:
+            return
+        cache = Content.get_content.cache
+        for siteurl in self.__dict__.pop("_content_siteurls", ()):
+            cache.pop((self, siteurl), None)
+
     def _has_valid_mandatory_properties(self) -> bool:
         """Test mandatory properties are set."""
         for prop in self.mandatory_properties:
@@ -347,14 +417,10 @@ class Content:
                         )
                     },
                 )
-        elif what == "category":
-            origin = joiner(siteurl, Category(path, self.settings).url)
-        elif what == "tag":
-            origin = joiner(siteurl, Tag(path, self.settings).url)
+        elif what in _TAXONOMY_CLASSES:
+            origin = joiner(siteurl, self._get_taxonomy_url(what, path))
         elif what == "index":
             origin = joiner(siteurl, self.settings["INDEX_SAVE_AS"])
-        elif what == "author":
-            origin = joiner(siteurl, Author(path, self.settings).url)
         else:
             logger.warning(
                 "Replacement Indicator %r not recognized in %r, skipping replacement",
@@ -369,16 +435,23 @@ class Content:
 
         return "".join((m.group("markup"), m.group("quote"), origin, m.group("quote")))
 
-    def _get_intrasite_link_regex(self) -> re.Pattern:
-        intrasite_link_regex = self.settings["INTRASITE_LINK_REGEX"]
-        regex = rf"""
-            (?P<markup><[^\>]+  # match tag with all url-value attributes
-                (?:href|src|poster|data|cite|formaction|action|content)\s*=\s*)
+    def _get_taxonomy_url(self, what: str, name: str) -> str:
+        """Return the URL of a category, tag or author page.
+
+        The URLs are memoized for the settings of the contents, which are
+        shared by a build, so that each one is only slugified once.
+        """
+        settings, urls = Content._taxonomy_urls
+        if settings is not self.settings:
+            urls = {}
+            Content._taxonomy_urls = (self.settings, urls)
+        key = (what, name)
+        if key not in urls:
+            urls[key] = _TAXONOMY_CLASSES[what](name, self.settings).url
+        return urls[key]
 
-            (?P<quote>["\'])      # require value to be quoted
-            (?P<path>{intrasite_link_regex}(?P<value>.*?))  # the url value
-            (?P=quote)"""
-        return re.compile(regex, re.X)
+    def _get_intrasite_link_regex(self) -> re.Pattern:
+        return _compile_intrasite_link_regex(self.settings["INTRASITE_LINK_REGEX"])
 
     def _update_content(self, content: str, siteurl: str) -> str:
         """Update the content attribute.
@@ -421,6 +494,9 @@ class Content:
 
     @memoized
     def get_content(self, siteurl: str) -> str:
+        if self._content_handle is not None:
+            # the memoized results to forget (see evict_content)
+            self.__dict__.setdefault("_content_siteurls", set()).add(siteurl)
         if hasattr(self, "_get_content"):
             content = self._get_content()
         else:
@@ -440,11 +516,13 @@ class Content:
         """
         if "summary" in self.metadata:
             return self.metadata["summary"]
+        return self._summarize(self.content)
 
-        content = self.content
+    def _summarize(self, content: str) -> str:
+        """Truncate the content to a summary (see get_summary)."""
         max_paragraphs = self.settings.get("SUMMARY_MAX_PARAGRAPHS")
         if max_paragraphs is not None:
-            content = truncate_html_paragraphs(self.content, max_paragraphs)
+            content = truncate_html_paragraphs(content, max_paragraphs)
 
         if self.settings["SUMMARY_MAX_LENGTH"] is None:
             summary = content
@@ -1,22 +1,26 @@
 import calendar
 import errno
-import fnmatch
+import hashlib
 import logging
 import os
+import re
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from itertools import chain, groupby
+from itertools import chain
 from operator import attrgetter
 
 from jinja2 import (
     BaseLoader,
     ChoiceLoader,
     Environment,
+    FileSystemBytecodeCache,
     FileSystemLoader,
     PrefixLoader,
     TemplateNotFound,
 )
 
+from pelican import profiling
 from pelican.cache import FileStampDataCacher
 from pelican.contents import Article, Page, SkipStub, Static
 from pelican.plugins import signals
@@ -24,7 +28,10 @@ from pelican.plugins._utils import plugin_enabled
 from pelican.readers import Readers
 from pelican.utils import (
     DateFormatter,
+    FileIndex,
+    OutputCompressor,
     copy,
+    get_filename_matcher,
     mkdir_p,
     order_content,
     posixize_path,
@@ -39,6 +46,85 @@ class PelicanTemplateNotFound(Exception):
     pass
 
 
+def _get_bytecode_cache(settings):
+    """Return a cache of the compiled templates, stored in CACHE_PATH
+
+    Jinja recompiles the templates whose source changed, but does not
+    know about the environment options the templates were compiled with,
+    so the cache files are named after them.
+    """
+    options = re.sub(
+        r" at 0x[0-9a-fA-F]+",  # not the addresses of functions
+        "",
+        repr(sorted(settings["JINJA_ENVIRONMENT"].items())),
+    )
+    directory = os.path.join(settings["CACHE_PATH"], "jinja2")
+    mkdir_p(directory)
+    return FileSystemBytecodeCache(
+        directory,
+        hashlib.blake2b(options.encode(), digest_size=8).hexdigest() + "-%s.cache",
+    )
+
+
+def _get_templates_path(settings, theme):
+    """Return the directories of the templates of theme, with overrides"""
+    templates_path = list(settings["THEME_TEMPLATES_OVERRIDES"])
+    templates_path.append(os.path.expanduser(os.path.join(theme, "templates")))
+    return templates_path
+
+
+def create_template_environment(settings, theme):
+    """Return the Jinja environment of the templates of theme
+
+    The environment is created once by build and shared by the generators
+    (see Pelican.run), so that every template is loaded and compiled once.
+    """
+    templates_path = _get_templates_path(settings, theme)
+    theme_loader = FileSystemLoader(templates_path[-1])
+
+    simple_theme_path = os.path.dirname(os.path.abspath(__file__))
+    simple_loader = FileSystemLoader(
+        os.path.join(simple_theme_path, "themes", "simple", "templates")
+    )
+
+    jinja_environment = dict(settings["JINJA_ENVIRONMENT"])
+    if settings["JINJA_BYTECODE_CACHE"] and "bytecode_cache" not in jinja_environment:
+        jinja_environment["bytecode_cache"] = _get_bytecode_cache(settings)
+
+    env = Environment(
+        loader=ChoiceLoader(
+            [
+                FileSystemLoader(templates_path),
+                simple_loader,  # implicit inheritance
+                PrefixLoader(
+                    {"!simple": simple_loader, "!theme": theme_loader}
+                ),  # explicit ones
+            ]
+        ),
+        **jinja_environment,
+    )
+
+    if logger.isEnabledFor(logging.DEBUG):
+        # listing the templates walks the theme directories
+        logger.debug("Template list: %s", env.list_templates())
+
+    # provide utils.strftime as a jinja filter
+    env.filters.update({"strftime": DateFormatter()})
+
+    # get custom Jinja filters from user settings
+    env.filters.update(settings["JINJA_FILTERS"])
+
+    # get custom Jinja globals from user settings
+    env.globals.update(settings["JINJA_GLOBALS"])
+
+    # get custom Jinja tests from user settings
+    env.tests["plugin_enabled"] = partial(
+        plugin_enabled, plugin_list=settings["PLUGINS"]
+    )
+    env.tests.update(settings["JINJA_TESTS"])
+    return env
+
+
 class Generator:
     """Baseclass generator"""
 
@@ -50,8 +136,25 @@ class Generator:
         theme,
         output_path,
         readers_cache_name="",
+        env=None,
+        memory_caches=None,
+        file_index=None,
+        file_hashes=None,
         **kwargs,
     ):
+        """*env* is the Jinja environment of the templates, which may be
+        shared with other generators; one is created if it is None.
+
+        *memory_caches* is the dictionary in which readers keep their cache
+        between the builds of a process (see WARM_REBUILD), if any.
+
+        *file_index* is the FileIndex of the directories scanned in the
+        build, which may be shared with other generators; one is created if
+        it is None.
+
+        *file_hashes* is the FileHashCache of the digests of the source
+        files, if CHECK_MODIFIED_METHOD is a hash.
+        """
         self.context = context
         self.settings = settings
         self.path = path
@@ -61,53 +164,27 @@ class Generator:
         for arg, value in kwargs.items():
             setattr(self, arg, value)
 
-        self.readers = Readers(self.settings, readers_cache_name)
+        if file_index is None:
+            file_index = FileIndex()
+        self.file_index = file_index
 
-        # templates cache
-        self._templates = {}
-        self._templates_path = list(self.settings["THEME_TEMPLATES_OVERRIDES"])
+        self.file_hashes = file_hashes
 
-        theme_templates_path = os.path.expanduser(os.path.join(self.theme, "templates"))
-        self._templates_path.append(theme_templates_path)
-        theme_loader = FileSystemLoader(theme_templates_path)
-
-        simple_theme_path = os.path.dirname(os.path.abspath(__file__))
-        simple_loader = FileSystemLoader(
-            os.path.join(simple_theme_path, "themes", "simple", "templates")
+        self.readers = Readers(
+            self.settings,
+            readers_cache_name,
+            memory_caches,
+            file_index,
+            file_hashes,
+            content_store=self.context.get("content_store"),
         )
 
-        self.env = Environment(
-            loader=ChoiceLoader(
-                [
-                    FileSystemLoader(self._templates_path),
-                    simple_loader,  # implicit inheritance
-                    PrefixLoader(
-                        {"!simple": simple_loader, "!theme": theme_loader}
-                    ),  # explicit ones
-                ]
-            ),
-            **self.settings["JINJA_ENVIRONMENT"],
-        )
-
-        logger.debug("Template list: %s", self.env.list_templates())
-
-        # provide utils.strftime as a jinja filter
-        self.env.filters.update({"strftime": DateFormatter()})
-
-        # get custom Jinja filters from user settings
-        custom_filters = self.settings["JINJA_FILTERS"]
-        self.env.filters.update(custom_filters)
-
-        # get custom Jinja globals from user settings
-        custom_globals = self.settings["JINJA_GLOBALS"]
-        self.env.globals.update(custom_globals)
-
-        # get custom Jinja tests from user settings
-        custom_tests = self.settings["JINJA_TESTS"]
-        self.env.tests["plugin_enabled"] = partial(
-            plugin_enabled, plugin_list=self.settings["PLUGINS"]
-        )
-        self.env.tests.update(custom_tests)
+        # templates cache
+        self._templates = {}
+        self._templates_path = _get_templates_path(self.settings, self.theme)
+        if env is None:
+            env = create_template_environment(self.settings, self.theme)
+        self.env = env
 
         signals.generator_init.send(self)
 
@@ -147,8 +224,7 @@ class Generator:
         basename = os.path.basename(path)
 
         # check IGNORE_FILES
-        ignores = self.settings["IGNORE_FILES"]
-        if any(fnmatch.fnmatch(basename, ignore) for ignore in ignores):
+        if get_filename_matcher(self.settings["IGNORE_FILES"]).matches(basename):
             return False
 
         ext = os.path.splitext(basename)[1][1:]
@@ -173,28 +249,24 @@ class Generator:
         if isinstance(paths, str):
             paths = [paths]
 
-        # group the exclude dir names by parent path, for use with os.walk()
+        # group the exclude dir names by parent path, for use when walking
         exclusions_by_dirpath = {}
         for e in exclude:
             parent_path, subdir = os.path.split(os.path.join(self.path, e))
             exclusions_by_dirpath.setdefault(parent_path, set()).add(subdir)
 
         files = set()
-        ignores = self.settings["IGNORE_FILES"]
+        ignore_matcher = get_filename_matcher(self.settings["IGNORE_FILES"])
         for path in paths:
             # careful: os.path.join() will add a slash when path == ''.
             root = os.path.join(self.path, path) if path else self.path
 
             if os.path.isdir(root):
-                for dirpath, dirs, temp_files in os.walk(
-                    root, topdown=True, followlinks=True
-                ):
+                for dirpath, dirs, temp_files in self.file_index.walk(root):
                     excl = exclusions_by_dirpath.get(dirpath, ())
                     # We copy the `dirs` list as we will modify it in the loop:
                     for d in list(dirs):
-                        if d in excl or any(
-                            fnmatch.fnmatch(d, ignore) for ignore in ignores
-                        ):
+                        if d in excl or ignore_matcher.matches(d):
                             if d in dirs:
                                 dirs.remove(d)
 
@@ -281,8 +353,70 @@ class CachingGenerator(Generator, FileStampDataCacher):
         caching_policy = cache_this_level and self.settings["CACHE_CONTENT"]
         load_policy = cache_this_level and self.settings["LOAD_CONTENT_CACHE"]
         FileStampDataCacher.__init__(
-            self, self.settings, cls_name, caching_policy, load_policy
+            self,
+            self.settings,
+            cls_name,
+            caching_policy,
+            load_policy,
+            stat=self.file_index.stat,
+            file_hashes=self.file_hashes,
+        )
+
+    def _cache_shared_objects(self):
+        return {"settings": self.settings, "context": self.context}
+
+    def _read_contents(self, paths, content_class, preread_signal, context_signal):
+        """Yield the valid content objects for paths, in order
+
+        Cached objects are reused; the remaining files are read, possibly
+        in parallel (see READER_WORKERS), and the new objects cached.
+        """
+        # sorted, so that the files are processed in the same order by every
+        # build
+        paths = sorted(paths)
+        cached = {}
+        for f in paths:
+            content = self.get_cached_data(f, None)
+            if content is not None:
+                cached[f] = content
+        profiling.count("generator_cache_hits", len(cached))
+
+        results = self.readers.read_files(
+            base_path=self.path,
+            paths=[f for f in paths if f not in cached],
+            content_class=content_class,
+            context=self.context,
+            preread_signal=preread_signal,
+            preread_sender=self,
+            context_signal=context_signal,
+            context_sender=self,
+            workers=self.settings["READER_WORKERS"],
         )
+        for f in paths:
+            if f in cached:
+                yield cached[f]
+                continue
+
+            _, content = next(results)
+            if isinstance(content, Exception):
+                logger.error(
+                    "Could not process %s",
+                    f,
+                    exc_info=content if self.settings.get("DEBUG", False) else False,
+                )
+                self._add_failed_source_path(f)
+                continue
+
+            if isinstance(content, SkipStub):
+                logger.debug("Safely skipping %s", f)
+                continue
+
+            if not content.is_valid():
+                self._add_failed_source_path(f)
+                continue
+
+            self.cache_data(f, content)
+            yield content
 
     def _get_file_stamp(self, filename):
         """Get filestamp for path relative to generator.path"""
@@ -518,6 +652,8 @@ class ArticlesGenerator(CachingGenerator):
                 url=article.url,
                 blog=True,
             )
+            # the feeds are already written
+            article.evict_content()
 
     def generate_period_archives(self, write):
         """Generate per-year, per-month, and per-day archives."""
@@ -569,8 +705,10 @@ class ArticlesGenerator(CachingGenerator):
     def generate_tags(self, write):
         """Generate Tags pages."""
         tag_template = self.get_template("tag")
-        for tag, articles in self.tags.items():
-            dates = [article for article in self.dates if article in articles]
+        groups = list(self.tags.items())
+        for (tag, articles), dates in zip(
+            groups, self._group_dates(groups), strict=True
+        ):
             try:
                 write(
                     tag.save_as,
@@ -600,8 +738,10 @@ class ArticlesGenerator(CachingGenerator):
     def generate_categories(self, write):
         """Generate category pages."""
         category_template = self.get_template("category")
-        for cat, articles in self.categories:
-            dates = [article for article in self.dates if article in articles]
+        groups = list(self.categories)
+        for (cat, articles), dates in zip(
+            groups, self._group_dates(groups), strict=True
+        ):
             try:
                 write(
                     cat.save_as,
@@ -631,8 +771,10 @@ class ArticlesGenerator(CachingGenerator):
     def generate_authors(self, write):
         """Generate Author pages."""
         author_template = self.get_template("author")
-        for aut, articles in self.authors:
-            dates = [article for article in self.dates if article in articles]
+        groups = list(self.authors)
+        for (aut, articles), dates in zip(
+            groups, self._group_dates(groups), strict=True
+        ):
             try:
                 write(
                     aut.save_as,
@@ -659,6 +801,21 @@ class ArticlesGenerator(CachingGenerator):
                     logger.error('Failed to write Author page for "%s".', aut)
                     raise
 
+    def _group_dates(self, groups):
+        """Return the articles of each (name, articles) group, sorted like
+        self.dates, in time linear to the number of articles of the groups.
+        """
+        # id(article) -> indexes of the groups holding it, without duplicates
+        indexes = defaultdict(dict)
+        for index, (_, articles) in enumerate(groups):
+            for article in articles:
+                indexes[id(article)][index] = None
+        dates = [[] for _ in groups]
+        for article in self.dates:
+            for index in indexes.get(id(article), ()):
+                dates[index].append(article)
+        return dates
+
     def generate_drafts(self, write):
         """Generate drafts pages."""
         for draft in chain(self.drafts_translations, self.drafts):
@@ -673,6 +830,7 @@ class ArticlesGenerator(CachingGenerator):
                 all_articles=self.articles,
                 url=draft.url,
             )
+            draft.evict_content()
 
     def generate_pages(self, writer):
         """Generate the pages on the disk"""
@@ -701,41 +859,15 @@ class ArticlesGenerator(CachingGenerator):
         all_articles = []
         all_drafts = []
         hidden_articles = []
-        for f in self.get_files(
-            self.settings["ARTICLE_PATHS"], exclude=self.settings["ARTICLE_EXCLUDES"]
+        for article in self._read_contents(
+            self.get_files(
+                self.settings["ARTICLE_PATHS"],
+                exclude=self.settings["ARTICLE_EXCLUDES"],
+            ),
+            content_class=Article,
+            preread_signal=signals.article_generator_preread,
+            context_signal=signals.article_generator_context,
         ):
-            article = self.get_cached_data(f, None)
-            if article is None:
-                try:
-                    article = self.readers.read_file(
-                        base_path=self.path,
-                        path=f,
-                        content_class=Article,
-                        context=self.context,
-                        preread_signal=signals.article_generator_preread,
-                        preread_sender=self,
-                        context_signal=signals.article_generator_context,
-                        context_sender=self,
-                    )
-                except Exception:
-                    logger.exception(
-                        "Could not process %s",
-                        f,
-                        exc_info=self.settings.get("DEBUG", False),
-                    )
-                    self._add_failed_source_path(f)
-                    continue
-
-                if isinstance(article, SkipStub):
-                    logger.debug("Safely skipping %s", f)
-                    continue
-
-                if not article.is_valid():
-                    self._add_failed_source_path(f)
-                    continue
-
-                self.cache_data(f, article)
-
             if article.status == "published":
                 all_articles.append(article)
             elif article.status == "draft":
@@ -838,41 +970,57 @@ class ArticlesGenerator(CachingGenerator):
             "day": attrgetter("date.year", "date.month", "date.day"),
         }
 
-        for granularity in "year", "month", "day":
-            save_as_fmt = period_archives_settings[granularity]["save_as"]
-            url_fmt = period_archives_settings[granularity]["url"]
-            key_func = granularity_key_func[granularity]
-
-            if not save_as_fmt:
-                # the archives for this period granularity are not needed
-                continue
-
-            for period, group in groupby(sorted_articles, key=key_func):
-                archive = {}
-
-                dates = list(group)
-                archive["dates"] = dates
-                archive["articles"] = [a for a in articles if a in dates]
-
-                # use the first date to specify the period archive URL
-                # and save_as; the specific date used does not matter as
-                # they all belong to the same period
-                d = dates[0].date
-                archive["save_as"] = save_as_fmt.format(date=d)
-                archive["url"] = url_fmt.format(date=d)
-
-                if granularity == "year":
-                    archive["period"] = (period,)
-                    archive["period_num"] = (period,)
-                else:
-                    month_name = calendar.month_name[period[1]]
-                    if granularity == "month":
-                        archive["period"] = (period[0], month_name)
+        granularities = [
+            (
+                granularity,
+                period_archives_settings[granularity]["save_as"],
+                period_archives_settings[granularity]["url"],
+                granularity_key_func[granularity],
+            )
+            for granularity in ("year", "month", "day")
+            # the archives of a granularity are only needed if saved
+            if period_archives_settings[granularity]["save_as"]
+        ]
+
+        # fill the archives of all granularities in one pass over the sorted
+        # articles; a new archive starts whenever the period changes
+        current = {}  # granularity -> (period, archive)
+        archives_of = defaultdict(dict)  # id(article) -> archives holding it
+        for article in sorted_articles:
+            for granularity, save_as_fmt, url_fmt, key_func in granularities:
+                period = key_func(article)
+                if granularity not in current or current[granularity][0] != period:
+                    # use the first date to specify the period archive URL
+                    # and save_as; the specific date used does not matter as
+                    # they all belong to the same period
+                    d = article.date
+                    archive = {
+                        "dates": [],
+                        "articles": [],
+                        "save_as": save_as_fmt.format(date=d),
+                        "url": url_fmt.format(date=d),
+                    }
+                    if granularity == "year":
+                        archive["period"] = (period,)
+                        archive["period_num"] = (period,)
                     else:
-                        archive["period"] = (period[0], month_name, period[2])
-                    archive["period_num"] = tuple(period)
-
-                period_archives[granularity].append(archive)
+                        month_name = calendar.month_name[period[1]]
+                        if granularity == "month":
+                            archive["period"] = (period[0], month_name)
+                        else:
+                            archive["period"] = (period[0], month_name, period[2])
+                        archive["period_num"] = tuple(period)
+                    current[granularity] = (period, archive)
+                    period_archives[granularity].append(archive)
+
+                archive = current[granularity][1]
+                archive["dates"].append(article)
+                archives_of[id(article)][id(archive)] = archive
+
+        # the articles of each archive keep the order of the articles list
+        for article in articles:
+            for archive in archives_of.get(id(article), {}).values():
+                archive["articles"].append(article)
 
         return period_archives
 
@@ -916,41 +1064,14 @@ class PagesGenerator(CachingGenerator):
         all_pages = []
         hidden_pages = []
         draft_pages = []
-        for f in self.get_files(
-            self.settings["PAGE_PATHS"], exclude=self.settings["PAGE_EXCLUDES"]
+        for page in self._read_contents(
+            self.get_files(
+                self.settings["PAGE_PATHS"], exclude=self.settings["PAGE_EXCLUDES"]
+            ),
+            content_class=Page,
+            preread_signal=signals.page_generator_preread,
+            context_signal=signals.page_generator_context,
         ):
-            page = self.get_cached_data(f, None)
-            if page is None:
-                try:
-                    page = self.readers.read_file(
-                        base_path=self.path,
-                        path=f,
-                        content_class=Page,
-                        context=self.context,
-                        preread_signal=signals.page_generator_preread,
-                        preread_sender=self,
-                        context_signal=signals.page_generator_context,
-                        context_sender=self,
-                    )
-                except Exception:
-                    logger.exception(
-                        "Could not process %s",
-                        f,
-                        exc_info=self.settings.get("DEBUG", False),
-                    )
-                    self._add_failed_source_path(f)
-                    continue
-
-                if isinstance(page, SkipStub):
-                    logger.debug("Safely skipping %s", f)
-                    continue
-
-                if not page.is_valid():
-                    self._add_failed_source_path(f)
-                    continue
-
-                self.cache_data(f, page)
-
             if page.status == "published":
                 all_pages.append(page)
             elif page.status == "hidden":
@@ -999,6 +1120,7 @@ class PagesGenerator(CachingGenerator):
                 override_output=hasattr(page, "override_save_as"),
                 url=page.url,
             )
+            page.evict_content()
         signals.page_writer_finalized.send(self, writer=writer)
 
     def refresh_metadata_intersite_links(self):
@@ -1020,6 +1142,9 @@ class StaticGenerator(Generator):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fallback_to_symlinks = False
+        # the paths of the output files, copied or up to date
+        self.output_paths = set()
+        self._compressor = OutputCompressor(self.settings)
         signals.static_generator_init.send(self)
 
     def check_disabled_readers(self) -> None:
@@ -1035,7 +1160,9 @@ class StaticGenerator(Generator):
             exclude=self.settings["STATIC_EXCLUDES"],
             extensions=False,
         )
-        for f in linked_files | found_files:
+        # sorted, so that the static files are processed in the same order
+        # by every build
+        for f in sorted(linked_files | found_files):
             # skip content source files unless the user explicitly wants them
             if self.settings["STATIC_EXCLUDE_SOURCES"]:
                 if self._is_potential_source_path(f):
@@ -1059,6 +1186,13 @@ class StaticGenerator(Generator):
 
     def generate_output(self, writer):
         del writer  # Unused argument
+        try:
+            self._publish_static_files()
+        finally:
+            self._compressor.wait()
+
+    def _publish_static_files(self):
+        self.output_paths = set()
         self._copy_paths(
             self.settings["THEME_STATIC_PATHS"],
             self.theme,
@@ -1066,11 +1200,35 @@ class StaticGenerator(Generator):
             self.output_path,
             os.curdir,
         )
+        # by output path: when several files are saved as the same path, the
+        # last one wins, as if they were copied one after the other
+        required = {}
         for sc in self.context["staticfiles"]:
+            self.output_paths.add(os.path.join(self.output_path, sc.save_as))
             if self._file_update_required(sc):
-                self._link_or_copy_staticfile(sc)
+                required.pop(sc.save_as, None)
+                required[sc.save_as] = sc
             else:
                 logger.debug("%s is up to date, not copying", sc.source_path)
+                self._compressor.compress(
+                    os.path.join(self.output_path, sc.save_as), changed=False
+                )
+        if not required:
+            return
+        workers = self.settings["STATIC_WORKERS"] or os.cpu_count() or 1
+        workers = min(workers, len(required))
+        if workers == 1:
+            for sc in required.values():
+                self._publish_staticfile(sc)
+            return
+        # copying is mostly I/O, during which threads release the GIL
+        with ThreadPoolExecutor(workers) as executor:
+            futures = [
+                executor.submit(self._publish_staticfile, sc)
+                for sc in required.values()
+            ]
+            for future in futures:
+                future.result()
 
     def _copy_paths(self, paths, source, destination, output_path, final_path=None):
         """Copy all the paths from source to destination"""
@@ -1089,15 +1247,25 @@ class StaticGenerator(Generator):
             else:
                 destination_path = os.path.join(output_path, destination, path)
 
-            copy(source_path, destination_path, self.settings["IGNORE_FILES"])
+            copied = copy(
+                source_path,
+                destination_path,
+                self.settings["IGNORE_FILES"],
+                only_modified=True,
+            )
+            self.output_paths.update(copied)
+            for copied_path in copied:
+                self._compressor.compress(copied_path, changed=False)
 
     def _file_update_required(self, staticfile):
         source_path = os.path.join(self.path, staticfile.source_path)
         save_as = os.path.join(self.output_path, staticfile.save_as)
-        if not os.path.exists(save_as):
+        try:
+            save_as_stat = os.stat(save_as)
+        except OSError:
             return True
-        elif self.settings["STATIC_CREATE_LINKS"] and os.path.samefile(
-            source_path, save_as
+        if self.settings["STATIC_CREATE_LINKS"] and os.path.samestat(
+            self.file_index.stat(source_path), save_as_stat
         ):
             return False
         elif (
@@ -1113,10 +1281,14 @@ class StaticGenerator(Generator):
     def _source_is_newer(self, staticfile):
         source_path = os.path.join(self.path, staticfile.source_path)
         save_as = os.path.join(self.output_path, staticfile.save_as)
-        s_mtime = os.path.getmtime(source_path)
+        s_mtime = self.file_index.stat(source_path).st_mtime
         d_mtime = os.path.getmtime(save_as)
         return s_mtime - d_mtime > 0.000001  # noqa: PLR2004
 
+    def _publish_staticfile(self, sc):
+        self._link_or_copy_staticfile(sc)
+        self._compressor.compress(os.path.join(self.output_path, sc.save_as))
+
     def _link_or_copy_staticfile(self, sc):
         if self.settings["STATIC_CREATE_LINKS"]:
             self._link_staticfile(sc)
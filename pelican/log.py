@@ -153,6 +153,54 @@ def init(
         LimitFilter.LOGS_DEDUP_MIN_LEVEL = logs_dedup_min_level
 
 
+class LogRecordCollector(logging.Handler):
+    """
+    Collect log records, in a picklable form, so that they can be replayed
+    in another process with replay_log_records().
+    """
+
+    _simple_types = (str, int, float, type(None))
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        msg, args = record.msg, record.args
+        if not isinstance(args, tuple) or not all(
+            isinstance(arg, self._simple_types) for arg in args
+        ):
+            msg, args = record.getMessage(), ()
+        if record.exc_info:
+            traceback = logging.Formatter().formatException(record.exc_info)
+            msg, args = f"{msg % args if args else msg}\n{traceback}", ()
+        extra = {
+            key: record.__dict__[key]
+            for key in ("limit_msg", "limit_args")
+            if key in record.__dict__
+        }
+        self.records.append((record.name, record.levelno, msg, args, extra))
+
+
+def init_worker_logging():
+    """Send all the log records of a worker process to a collector.
+
+    Filtering and aborting on --fatal errors or warnings are left to the main
+    process, when it replays the records.
+    """
+    collector = LogRecordCollector()
+    logging.getLogger().handlers = [collector]
+    LimitFilter.LOGS_DEDUP_MIN_LEVEL = logging.NOTSET - 1
+    FatalLogger.fatal_lvl = logging.CRITICAL + 1
+    return collector
+
+
+def replay_log_records(records):
+    """Log again the records collected by a LogRecordCollector."""
+    for name, level, msg, args, extra in records:
+        logging.getLogger(name).log(level, msg, *args, extra=extra)
+
+
 def log_warnings():
     logging.captureWarnings(True)
     warnings.simplefilter("default", DeprecationWarning)
@@ -0,0 +1,177 @@
+"""Timings and counters of a build
+
+Pelican records them while a profile is active (see :func:`profile_build`,
+used by the ``--profile`` and ``--stats-json`` command-line options). The
+functions of this module do nothing otherwise.
+
+Timings are inclusive: the time of a signal receiver is also counted in
+the phase and generator it was sent from.
+"""
+
+import collections
+import contextlib
+import functools
+import json
+import threading
+import time
+
+from blinker import Signal
+
+from pelican.plugins import signals
+
+# the profile of the current build, if any
+_profile = None
+_lock = threading.Lock()
+
+
+class BuildProfile:
+    """Wall and CPU times, by category and name, and counters"""
+
+    def __init__(self):
+        # (category, name) -> [wall time, CPU time, calls]
+        self.timings = {}
+        self.counters = collections.Counter()
+
+    def add_time(self, category, name, wall, cpu, calls=1):
+        timing = self.timings.setdefault((category, name), [0.0, 0.0, 0])
+        timing[0] += wall
+        timing[1] += cpu
+        timing[2] += calls
+
+    def merge(self, other):
+        """Add the timings and counters of another profile"""
+        for (category, name), (wall, cpu, calls) in other.timings.items():
+            self.add_time(category, name, wall, cpu, calls)
+        self.counters.update(other.counters)
+
+    def as_dict(self):
+        """Return the report, as a JSON-serializable dictionary"""
+        report = {"counters": dict(sorted(self.counters.items()))}
+        for (category, name), (wall, cpu, calls) in self.timings.items():
+            report.setdefault(category, {})[name] = {
+                "wall": round(wall, 6),
+                "cpu": round(cpu, 6),
+                "calls": calls,
+            }
+        return report
+
+    def format(self, limit=10):
+        """Return the report as text, with the slowest items of each
+        category"""
+        lines = []
+        categories = sorted({category for category, _ in self.timings})
+        for category in categories:
+            lines.append(f"{category}:")
+            items = sorted(
+                (
+                    (timing, name)
+                    for (cat, name), timing in self.timings.items()
+                    if cat == category
+                ),
+                reverse=True,
+            )
+            for (wall, cpu, calls), name in items[:limit]:
+                lines.append(f"  {wall:8.3f}s wall {cpu:8.3f}s CPU {calls:6d}x  {name}")
+        if self.counters:
+            lines.append("counters:")
+            lines.extend(
+                f"  {name}: {value}" for name, value in sorted(self.counters.items())
+            )
+        return "\n".join(lines)
+
+
+def is_active():
+    return _profile is not None
+
+
+@contextlib.contextmanager
+def timer(category, name):
+    """Record the time spent in the block, if a profile is active"""
+    if _profile is None:
+        yield
+        return
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        # the profile may have been swapped in the meantime
+        if _profile is not None:
+            _profile.add_time(
+                category,
+                name,
+                time.perf_counter() - wall,
+                time.process_time() - cpu,
+            )
+
+
+def count(name, value=1):
+    """Add value to a counter, if a profile is active"""
+    if _profile is not None:
+        # files are copied and compressed by threads
+        with _lock:
+            _profile.counters[name] += value
+
+
+def merge(profile):
+    """Add a profile collected by a worker process to the active one"""
+    if _profile is not None and profile is not None:
+        _profile.merge(profile)
+
+
+@contextlib.contextmanager
+def collecting():
+    """Record the block in a new profile, if a profile is active
+
+    Used by worker processes, whose profile must be sent back to the main
+    process (see :func:`merge`). Yield the new profile, or None.
+    """
+    global _profile  # noqa: PLW0603
+    if _profile is None:
+        yield None
+        return
+    previous, _profile = _profile, BuildProfile()
+    try:
+        yield _profile
+    finally:
+        _profile = previous
+
+
+def _timed_send(signal, sender=None, /, **kwargs):
+    """Send a signal like Signal.send, timing each receiver"""
+    if signal.is_muted or kwargs.get("_async_wrapper") is not None:
+        return Signal.send(signal, sender, **kwargs)
+    results = []
+    for receiver in signal.receivers_for(sender):
+        name = getattr(receiver, "__qualname__", type(receiver).__qualname__)
+        module = getattr(receiver, "__module__", None)
+        with timer("signals", f"{signal.name}: {module}.{name}"):
+            results.append((receiver, receiver(sender, **kwargs)))
+    return results
+
+
+@contextlib.contextmanager
+def profile_build():
+    """Activate a new profile for the block, and yield it
+
+    The receivers of the signals of pelican.plugins.signals are timed too.
+    """
+    global _profile  # noqa: PLW0603
+    timed_signals = [
+        value for value in vars(signals).values() if isinstance(value, Signal)
+    ]
+    _profile = BuildProfile()
+    for signal in timed_signals:
+        signal.send = functools.partial(_timed_send, signal)
+    try:
+        with timer("phases", "total"):
+            yield _profile
+    finally:
+        for signal in timed_signals:
+            del signal.send
+        _profile = None
+
+
+def write_report(profile, path):
+    """Write the report of a profile to path, as JSON"""
+    with open(path, "w", encoding="utf-8") as fd:
+        json.dump(profile.as_dict(), fd, indent=2)
@@ -1,5 +1,7 @@
 import datetime
+import io
 import logging
+import multiprocessing
 import os
 import re
 from collections import OrderedDict
@@ -13,11 +15,22 @@ import docutils.io
 from docutils.parsers.rst.languages import get_language as get_docutils_lang
 from docutils.writers.html4css1 import HTMLTranslator, Writer
 
-from pelican import rstdirectives  # NOQA
-from pelican.cache import FileStampDataCacher
+from pelican import profiling, rstdirectives  # NOQA
+from pelican.cache import (
+    FileStampDataCacher,
+    SharedObjectPickler,
+    SharedObjectUnpickler,
+)
 from pelican.contents import Author, Category, Page, SkipStub, Tag
+from pelican.log import init_worker_logging, replay_log_records
 from pelican.plugins import signals
-from pelican.utils import file_suffix, get_date, pelican_open, posixize_path
+from pelican.utils import (
+    file_suffix,
+    get_date,
+    get_worker_count,
+    pelican_open,
+    posixize_path,
+)
 
 try:
     from markdown import Markdown
@@ -519,8 +532,40 @@ class Readers(FileStampDataCacher):
 
     """
 
-    def __init__(self, settings=None, cache_name=""):
+    # the settings that change what readers return, so that other settings
+    # (site name, URLs, theme...) can be changed without reading all the
+    # files again
+    _fingerprinted_settings = (
+        "READERS",
+        "MARKDOWN",
+        "DOCUTILS_SETTINGS",
+        "PYGMENTS_RST_OPTIONS",
+        "FORMATTED_FIELDS",
+        "TYPOGRIFY*",
+        "PATH_METADATA",
+        "FILENAME_METADATA",
+        "EXTRA_PATH_METADATA",
+        "DEFAULT_DATE*",
+        "TIMEZONE",
+        "DEFAULT_LANG",
+        "SUMMARY_*",
+        # the slugs of the categories, tags and authors of the metadata
+        "SLUGIFY_*",
+        "*_REGEX_SUBSTITUTIONS",
+    )
+
+    def __init__(
+        self,
+        settings=None,
+        cache_name="",
+        memory=None,
+        file_index=None,
+        file_hashes=None,
+        content_store=None,
+    ):
         self.settings = settings or {}
+        # the ContentStore keeping the texts of the cache (see LAZY_CONTENT)
+        self._content_store = content_store
         self.readers = {}
         self.disabled_readers = {}
         # extension => reader for readers that are enabled
@@ -554,13 +599,49 @@ class Readers(FileStampDataCacher):
         for fmt, reader_class in disabled_reader_classes.items():
             self.disabled_readers[fmt] = reader_class(self.settings)
 
+        # the metadata of paths is looked up for every file read
+        self._epm_index = _index_extra_path_metadata(self.settings)
+        self._path_metadata_regexps = _compile_path_metadata_regexps(self.settings)
+
+        if any(
+            cls and cls.__module__ != __name__ for cls in self.reader_classes.values()
+        ):
+            # the settings read by the readers of plugins are unknown
+            self._fingerprinted_settings = None
+
         # set up caching
         cache_this_level = (
             cache_name != "" and self.settings["CONTENT_CACHING_LAYER"] == "reader"
         )
         caching_policy = cache_this_level and self.settings["CACHE_CONTENT"]
         load_policy = cache_this_level and self.settings["LOAD_CONTENT_CACHE"]
-        super().__init__(settings, cache_name, caching_policy, load_policy)
+        # the output of the readers is kept in memory for warm rebuilds
+        # whatever the caching layer, as content objects cannot be reused
+        super().__init__(
+            settings,
+            cache_name,
+            caching_policy,
+            load_policy,
+            memory=memory if cache_name != "" else None,
+            # the stat results and digests of the files are shared with the
+            # generators
+            stat=file_index.stat if file_index is not None else os.stat,
+            file_hashes=file_hashes,
+        )
+
+    def _pack(self, data):
+        # with LAZY_CONTENT, the cached texts are kept on disk until the cache
+        # is saved; their handles are tuples, which texts cannot be
+        stamp, (content, metadata) = data
+        if self._content_store is None or not isinstance(content, str):
+            return data
+        return stamp, (self._content_store.put(content), metadata)
+
+    def _unpack(self, data):
+        stamp, (content, metadata) = data
+        if not isinstance(content, tuple):
+            return data
+        return stamp, (self._content_store.get(content), metadata)
 
     @property
     def extensions(self):
@@ -585,6 +666,148 @@ class Readers(FileStampDataCacher):
     ):
         """Return a content object parsed with the given format."""
 
+        path, source_path, fmt = self._resolve_path(base_path, path, content_class, fmt)
+
+        if preread_signal:
+            logger.debug("Signal %s.send(%s)", preread_signal.name, preread_sender)
+            preread_signal.send(preread_sender)
+
+        content, metadata, _ = self._read_content(path, source_path, fmt)
+
+        return self._build_content(
+            path,
+            content,
+            metadata,
+            content_class,
+            context,
+            context_signal,
+            context_sender,
+        )
+
+    def read_files(
+        self,
+        base_path,
+        paths,
+        content_class=Page,
+        fmt=None,
+        context=None,
+        preread_signal=None,
+        preread_sender=None,
+        context_signal=None,
+        context_sender=None,
+        workers=1,
+    ):
+        """Read several files, yielding ``(path, content)`` pairs.
+
+        Pairs are yielded in the order of *paths*. *content* is the content
+        object returned by :meth:`read_file`, or the exception raised while
+        reading the file.
+
+        If *workers* is greater than one, the parsing of the files (reader,
+        typogrify and metadata processing) is spread across that many forked
+        processes. The signals are still sent, and the content objects still
+        built, in the current process. A *workers* value of 0 uses one process
+        per CPU.
+        """
+        paths = list(paths)
+        workers = get_worker_count(workers, len(paths))
+
+        if workers == 1:
+            for path in paths:
+                try:
+                    content = self.read_file(
+                        base_path,
+                        path,
+                        content_class=content_class,
+                        fmt=fmt,
+                        context=context,
+                        preread_signal=preread_signal,
+                        preread_sender=preread_sender,
+                        context_signal=context_signal,
+                        context_sender=context_sender,
+                    )
+                except Exception as err:  # noqa: BLE001
+                    content = err
+                yield path, content
+            return
+
+        # Resolve the paths and send the preread signals up front, since
+        # the files are about to be parsed concurrently.
+        resolved = []
+        for path in paths:
+            try:
+                resolved.append(self._resolve_path(base_path, path, content_class, fmt))
+            except Exception as err:  # noqa: BLE001
+                resolved.append(err)
+                continue
+            if preread_signal:
+                logger.debug("Signal %s.send(%s)", preread_signal.name, preread_sender)
+                preread_signal.send(preread_sender)
+
+        tasks = [r for r in resolved if not isinstance(r, Exception)]
+        chunksize = max(1, len(tasks) // (workers * 4))
+        pool_context = multiprocessing.get_context("fork")
+        with pool_context.Pool(
+            workers, initializer=_init_reader_worker, initargs=(self,)
+        ) as pool:
+            outputs = pool.imap(_read_in_worker, tasks, chunksize=chunksize)
+            for path, task in zip(paths, resolved, strict=True):
+                if isinstance(task, Exception):
+                    yield path, task
+                    continue
+
+                full_path, source_path, file_fmt = task
+                try:
+                    content, metadata = self._collect_worker_output(
+                        next(outputs), full_path, source_path, file_fmt
+                    )
+                    content = self._build_content(
+                        full_path,
+                        content,
+                        metadata,
+                        content_class,
+                        context,
+                        context_signal,
+                        context_sender,
+                    )
+                except Exception as err:  # noqa: BLE001
+                    content = err
+                yield path, content
+
+    def _collect_worker_output(self, output, path, source_path, fmt):
+        """Unpack the output of :func:`_read_in_worker` for a file.
+
+        Replay the log records of the worker and return a ``(content,
+        metadata)`` tuple. The exception raised in the worker, if any, is
+        raised again.
+        """
+        unpickler = SharedObjectUnpickler(
+            io.BytesIO(output), {"settings": self.settings}
+        )
+        records, profile, digests, status, *result = unpickler.load()
+        replay_log_records(records)
+        profiling.merge(profile)
+        if digests:
+            # so that the files are not hashed again by this process
+            self._file_hashes.add_digests(digests)
+
+        if status == "error":
+            raise result[0]
+
+        if status == "unpicklable":
+            # The worker could not send the result back, so read the file
+            # again in this process.
+            logger.debug("Reading %s again in the main process", source_path)
+            content, metadata, _ = self._read_content(path, source_path, fmt)
+            return content, metadata
+
+        content, metadata, reader_output = result
+        if reader_output is not None:
+            self.cache_data(path, reader_output)
+        return content, metadata
+
+    def _resolve_path(self, base_path, path, content_class, fmt):
+        """Return the absolute path, source path and format of a file."""
         path = os.path.abspath(os.path.join(base_path, path))
         source_path = posixize_path(os.path.relpath(path, base_path))
         logger.debug("Read file %s -> %s", source_path, content_class.__name__)
@@ -595,10 +818,15 @@ class Readers(FileStampDataCacher):
         if fmt not in self.readers:
             raise TypeError("Pelican does not know how to parse %s", path)
 
-        if preread_signal:
-            logger.debug("Signal %s.send(%s)", preread_signal.name, preread_sender)
-            preread_signal.send(preread_sender)
+        return path, source_path, fmt
+
+    def _read_content(self, path, source_path, fmt):
+        """Parse a file and process its metadata.
 
+        Return a ``(content, metadata, reader_output)`` tuple, where
+        *reader_output* is the raw output of the reader if it was not found in
+        the cache, or None.
+        """
         reader = self.readers[fmt]
 
         metadata = _filter_discardable_metadata(
@@ -606,7 +834,11 @@ class Readers(FileStampDataCacher):
         )
         metadata.update(
             path_metadata(
-                full_path=path, source_path=source_path, settings=self.settings
+                full_path=path,
+                source_path=source_path,
+                settings=self.settings,
+                epm_index=self._epm_index,
+                stat=self._stat,
             )
         )
         metadata.update(
@@ -615,17 +847,24 @@ class Readers(FileStampDataCacher):
                     source_path=source_path,
                     settings=self.settings,
                     process=reader.process_metadata,
+                    regexps=self._path_metadata_regexps,
                 )
             )
         )
         reader_name = reader.__class__.__name__
         metadata["reader"] = reader_name.replace("Reader", "").lower()
 
+        reader_output = None
         content, reader_metadata = self.get_cached_data(path, (None, None))
         if content is None:
-            content, reader_metadata = reader.read(path)
+            profiling.count("files_read")
+            with profiling.timer("readers", reader_name):
+                content, reader_metadata = reader.read(path)
             reader_metadata = _filter_discardable_metadata(reader_metadata)
-            self.cache_data(path, (content, reader_metadata))
+            reader_output = (content, reader_metadata)
+            self.cache_data(path, reader_output)
+        else:
+            profiling.count("reader_cache_hits")
         metadata.update(reader_metadata)
 
         if content:
@@ -679,6 +918,19 @@ class Readers(FileStampDataCacher):
             if "summary" in metadata:
                 metadata["summary"] = typogrify_wrapper(metadata["summary"])
 
+        return content, metadata, reader_output
+
+    def _build_content(
+        self,
+        path,
+        content,
+        metadata,
+        content_class,
+        context,
+        context_signal,
+        context_sender,
+    ):
+        """Send the context signal and build the content object of a file."""
         if context_signal:
             logger.debug(
                 "Signal %s.send(%s, <metadata>)", context_signal.name, context_sender
@@ -703,6 +955,55 @@ class Readers(FileStampDataCacher):
             logger.warning(f"{source_path}: {reader.disabled_message()}")
 
 
+_worker_readers = None
+_worker_log_collector = None
+
+
+def _init_reader_worker(readers):
+    """Set up a forked reader worker process."""
+    global _worker_readers, _worker_log_collector  # noqa: PLW0603
+    # the output of the worker is cached by the main process, which also
+    # owns the content store
+    readers._cache_data_policy = False
+    readers._memory = None
+    _worker_readers = readers
+    _worker_log_collector = init_worker_logging()
+    if readers._file_hashes is not None:
+        # only the digests computed by the worker are sent back
+        readers._file_hashes.collect_digests()
+
+
+def _read_in_worker(task):
+    """Read a file in a reader worker process, return the pickled output."""
+    path, source_path, fmt = task
+    _worker_log_collector.records = []
+    with profiling.collecting() as profile:
+        try:
+            output = ("ok", *_worker_readers._read_content(path, source_path, fmt))
+        except Exception as err:  # noqa: BLE001
+            output = ("error", err)
+
+    file_hashes = _worker_readers._file_hashes
+    digests = file_hashes.collect_digests() if file_hashes is not None else None
+
+    buffer = io.BytesIO()
+    try:
+        SharedObjectPickler(buffer, {"settings": _worker_readers.settings}).dump(
+            (_worker_log_collector.records, profile, digests, *output)
+        )
+    except Exception:  # noqa: BLE001
+        buffer = io.BytesIO()
+        if output[0] == "error":
+            error = RuntimeError(f"{output[1].__class__.__name__}: {output[1]}")
+            output = ("error", error)
+        else:
+            output = ("unpicklable",)
+        SharedObjectPickler(buffer, {"settings": _worker_readers.settings}).dump(
+            (_worker_log_collector.records, profile, digests, *output)
+        )
+    return buffer.getvalue()
+
+
 def find_empty_alt(content, path):
     """Find images with empty alt
 
@@ -759,32 +1060,67 @@ def default_metadata(settings=None, process=None):
     return metadata
 
 
-def path_metadata(full_path, source_path, settings=None):
+def _index_extra_path_metadata(settings):
+    """Index the paths of EXTRA_PATH_METADATA by their directory form.
+
+    Return an ``(epm, paths_by_dir)`` tuple for :func:`path_metadata`, where
+    *paths_by_dir* maps each path, with a trailing slash, to the paths of
+    EXTRA_PATH_METADATA it comes from.
+    """
+    epm = settings.get("EXTRA_PATH_METADATA", {})
+    paths_by_dir = {}
+    for path in epm:
+        # Enforce a trailing slash when checking for parent directories.
+        # This prevents false positives when one file or directory's name
+        # is a prefix of another's.
+        dirpath = posixize_path(os.path.join(path, ""))
+        paths_by_dir.setdefault(dirpath, []).append(path)
+    return epm, paths_by_dir
+
+
+def path_metadata(full_path, source_path, settings=None, epm_index=None, stat=os.stat):
     metadata = {}
     if settings:
         if settings.get("DEFAULT_DATE", None) == "fs":
-            metadata["date"] = datetime.datetime.fromtimestamp(
-                os.stat(full_path).st_mtime
-            )
+            metadata["date"] = datetime.datetime.fromtimestamp(stat(full_path).st_mtime)
             metadata["modified"] = metadata["date"]
 
         # Apply EXTRA_PATH_METADATA for the source path and the paths of any
-        # parent directories. Sorting EPM first ensures that the most specific
-        # path wins conflicts.
-
-        epm = settings.get("EXTRA_PATH_METADATA", {})
-        for path, meta in sorted(epm.items()):
-            # Enforce a trailing slash when checking for parent directories.
-            # This prevents false positives when one file or directory's name
-            # is a prefix of another's.
-            dirpath = posixize_path(os.path.join(path, ""))
-            if source_path == path or source_path.startswith(dirpath):
-                metadata.update(meta)
+        # parent directories. Sorting the matching paths first ensures that
+        # the most specific path wins conflicts.
+        if epm_index is None:
+            epm_index = _index_extra_path_metadata(settings)
+        epm, paths_by_dir = epm_index
+        paths = set()
+        if source_path in epm:
+            paths.add(source_path)
+        for end, char in enumerate(source_path, 1):
+            if char == "/":
+                paths.update(paths_by_dir.get(source_path[:end], ()))
+        paths.update(paths_by_dir.get("", ()))
+        for path in sorted(paths):
+            metadata.update(epm[path])
 
     return metadata
 
 
-def parse_path_metadata(source_path, settings=None, process=None):
+def _compile_path_metadata_regexps(settings):
+    """Compile the regexps of the metadata found in file paths.
+
+    Return a list of ``(regexp, part)`` tuples for
+    :func:`parse_path_metadata`, where *part* is the part of the path the
+    regexp applies to: "filename", "path" or "folder".
+    """
+    regexps = []
+    for key, part in [("FILENAME_METADATA", "filename"), ("PATH_METADATA", "path")]:
+        if settings.get(key, None):
+            regexps.append((re.compile(settings[key]), part))
+    if settings.get("USE_FOLDER_AS_CATEGORY") and settings.get("CATEGORY_SAVE_AS"):
+        regexps.append((re.compile("(?P<category>.*)"), "folder"))
+    return regexps
+
+
+def parse_path_metadata(source_path, settings=None, process=None, regexps=None):
     r"""Extract a metadata dictionary from a file's path
 
     >>> import pprint
@@ -808,14 +1144,12 @@ def parse_path_metadata(source_path, settings=None, process=None):
     base, ext = os.path.splitext(basename)
     subdir = os.path.basename(dirname)
     if settings:
-        checks = []
-        for key, data in [("FILENAME_METADATA", base), ("PATH_METADATA", source_path)]:
-            checks.append((settings.get(key, None), data))
-        if settings.get("USE_FOLDER_AS_CATEGORY") and settings.get("CATEGORY_SAVE_AS"):
-            checks.append(("(?P<category>.*)", subdir))
-        for regexp, data in checks:
-            if regexp and data:
-                match = re.match(regexp, data)
+        if regexps is None:
+            regexps = _compile_path_metadata_regexps(settings)
+        data = {"filename": base, "path": source_path, "folder": subdir}
+        for regexp, part in regexps:
+            if data[part]:
+                match = regexp.match(data[part])
                 if match:
                     # .items() for py3k compat.
                     for k, v in match.groupdict().items():
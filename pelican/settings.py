@@ -13,6 +13,7 @@ from typing import Any
 
 from pelican.log import LimitFilter
 from pelican.paginator import PaginationRule
+from pelican.utils import PRECOMPRESS_FORMATS
 
 
 def load_source(name: str, path: str) -> ModuleType:
@@ -134,6 +135,7 @@ DEFAULT_CONFIG = {
     "JINJA_FILTERS": {},
     "JINJA_GLOBALS": {},
     "JINJA_TESTS": {},
+    "JINJA_BYTECODE_CACHE": False,
     "JINJA_ENVIRONMENT": {
         "trim_blocks": True,
         "lstrip_blocks": True,
@@ -173,9 +175,30 @@ DEFAULT_CONFIG = {
     "CACHE_CONTENT": False,
     "CONTENT_CACHING_LAYER": "reader",
     "CACHE_PATH": "cache",
+    "CACHE_STORAGE": "pickle",
     "GZIP_CACHE": True,
     "CHECK_MODIFIED_METHOD": "mtime",
     "LOAD_CONTENT_CACHE": False,
+    "INCREMENTAL_BUILD": False,
+    "WARM_REBUILD": False,
+    "SKIP_UNCHANGED_OUTPUT": False,
+    "READER_WORKERS": 1,
+    "WRITER_WORKERS": 1,
+    "STATIC_WORKERS": 1,
+    "STREAM_OUTPUT": False,
+    "OUTPUT_STAGING": False,
+    "LAZY_CONTENT": False,
+    "OUTPUT_PRECOMPRESS": [],
+    "OUTPUT_PRECOMPRESS_EXTENSIONS": [
+        ".html",
+        ".htm",
+        ".xml",
+        ".css",
+        ".js",
+        ".json",
+        ".svg",
+        ".txt",
+    ],
     "FORMATTED_FIELDS": ["summary"],
     "PORT": 8000,
     "BIND": "127.0.0.1",
@@ -736,6 +759,23 @@ def configure_settings(settings: Settings) -> Settings:
             )
             settings[PATH_KEY] = DEFAULT_CONFIG[PATH_KEY]
 
+    # Keep the precompression formats that can be written
+    if isinstance(settings.get("OUTPUT_PRECOMPRESS"), str):
+        settings["OUTPUT_PRECOMPRESS"] = [settings["OUTPUT_PRECOMPRESS"]]
+    if settings.get("OUTPUT_PRECOMPRESS"):
+        for name in settings["OUTPUT_PRECOMPRESS"]:
+            if name not in PRECOMPRESS_FORMATS:
+                logger.warning(
+                    "Ignoring %r in OUTPUT_PRECOMPRESS: unknown format, or the "
+                    "module it needs is not installed",
+                    name,
+                )
+        settings["OUTPUT_PRECOMPRESS"] = [
+            name
+            for name in settings["OUTPUT_PRECOMPRESS"]
+            if name in PRECOMPRESS_FORMATS
+        ]
+
     # Add {PAGE,ARTICLE}_PATHS to {ARTICLE,PAGE}_EXCLUDES
     mutually_exclusive = ("ARTICLE", "PAGE")
     for type_1, type_2 in [mutually_exclusive, mutually_exclusive[::-1]]:
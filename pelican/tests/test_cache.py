@@ -1,10 +1,22 @@
+import hashlib
+import multiprocessing
 import os
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
 from shutil import rmtree
 from tempfile import mkdtemp
-from unittest.mock import MagicMock
-
+from unittest.mock import MagicMock, patch
+
+from pelican.cache import (
+    BuildManifest,
+    ContentStore,
+    FileHashCache,
+    SQLiteCacheStore,
+)
 from pelican.generators import ArticlesGenerator, PagesGenerator
-from pelican.tests.support import get_context, get_settings, unittest
+from pelican.readers import Readers
+from pelican.tests.support import get_article, get_context, get_settings, unittest
 
 CUR_DIR = os.path.dirname(__file__)
 CONTENT_DIR = os.path.join(CUR_DIR, "content")
@@ -256,6 +268,93 @@ class TestCache(unittest.TestCase):
         generator.generate_context()
         self.assertEqual(generator.readers.read_file.call_count, orig_call_count)
 
+    def test_cache_fingerprint(self):
+        """Test that caches are ignored when the settings or the reader
+        libraries change"""
+        for storage in ("pickle", "sqlite"):
+            with self.subTest(storage=storage):
+                settings = self._get_cache_enabled_settings()
+                settings["CACHE_STORAGE"] = storage
+                settings["CACHE_PATH"] = os.path.join(self.temp_cache, storage)
+                settings["READERS"] = {"asc": None}
+
+                def read_count(settings):
+                    generator = ArticlesGenerator(
+                        context=get_context(settings),
+                        settings=settings,
+                        path=CONTENT_DIR,
+                        theme=settings["THEME"],
+                        output_path=None,
+                    )
+                    readers = generator.readers.readers.values()
+                    for reader in readers:
+                        reader.read = MagicMock(wraps=reader.read)
+                    generator.generate_context()
+                    return sum(reader.read.call_count for reader in readers)
+
+                count = read_count(settings)
+                self.assertGreater(count, 0)
+                self.assertEqual(read_count(settings), 0)
+                # settings that do not change what is built are ignored
+                settings["WRITER_WORKERS"] = 2
+                self.assertEqual(read_count(settings), 0)
+                # and so are those that do not change what readers return
+                settings["SITENAME"] = "Another site"
+                settings["THEME"] = os.path.join(self.temp_cache, "theme")
+                self.assertEqual(read_count(settings), 0)
+
+                settings["SUMMARY_MAX_LENGTH"] = 10
+                self.assertEqual(read_count(settings), count)
+                self.assertEqual(read_count(settings), 0)
+
+                with patch("pelican.cache._get_library_version", return_value="0"):
+                    self.assertEqual(read_count(settings), count)
+                self.assertEqual(read_count(settings), count)
+
+    def test_plugin_reader_cache_fingerprint(self):
+        """Test that the reader cache fingerprints all the settings when
+        readers of plugins, which may read any setting, are enabled"""
+
+        class PluginReader:
+            def __init__(self, settings):
+                self.settings = settings
+
+        settings = self._get_cache_enabled_settings()
+        other_settings = {**settings, "SITENAME": "Another site"}
+        self.assertEqual(
+            Readers(settings, "readers")._cache_fingerprint,
+            Readers(other_settings, "readers")._cache_fingerprint,
+        )
+        settings["READERS"] = other_settings["READERS"] = {"plug": PluginReader}
+        self.assertNotEqual(
+            Readers(settings, "readers")._cache_fingerprint,
+            Readers(other_settings, "readers")._cache_fingerprint,
+        )
+
+    def test_generator_cache_fingerprint(self):
+        """Test that the generator cache is ignored when any setting that
+        changes what is built changes"""
+        settings = self._get_cache_enabled_settings()
+        settings["CONTENT_CACHING_LAYER"] = "generator"
+        settings["READERS"] = {"asc": None}
+
+        def read_count(settings):
+            generator = ArticlesGenerator(
+                context=get_context(settings),
+                settings=settings,
+                path=CONTENT_DIR,
+                theme=settings["THEME"],
+                output_path=None,
+            )
+            generator.readers.read_file = MagicMock(wraps=generator.readers.read_file)
+            generator.generate_context()
+            return generator.readers.read_file.call_count
+
+        count = read_count(settings)
+        self.assertLess(read_count(settings), count)
+        settings["SITENAME"] = "Another site"
+        self.assertEqual(read_count(settings), count)
+
     def test_page_object_caching(self):
         """Test Page objects caching at the generator level"""
         settings = self._get_cache_enabled_settings()
@@ -352,3 +451,401 @@ class TestCache(unittest.TestCase):
         generator.readers.read_file = MagicMock()
         generator.generate_context()
         self.assertEqual(generator.readers.read_file.call_count, orig_call_count)
+
+    def test_sqlite_reader_caching(self):
+        """Test raw content caching in the SQLite cache storage"""
+        settings = self._get_cache_enabled_settings()
+        settings["CACHE_STORAGE"] = "sqlite"
+        settings["READERS"] = {"asc": None}
+        context = get_context(settings)
+
+        generator = ArticlesGenerator(
+            context=context.copy(),
+            settings=settings,
+            path=CONTENT_DIR,
+            theme=settings["THEME"],
+            output_path=None,
+        )
+        generator.generate_context()
+        uncached_articles = [(a.title, a.content) for a in generator.articles]
+        self.assertTrue(
+            os.path.isfile(
+                os.path.join(self.temp_cache, "ArticlesGenerator-Readers.sqlite")
+            )
+        )
+
+        generator = ArticlesGenerator(
+            context=context.copy(),
+            settings=settings,
+            path=CONTENT_DIR,
+            theme=settings["THEME"],
+            output_path=None,
+        )
+        readers = generator.readers.readers
+        for reader in readers.values():
+            reader.read = MagicMock()
+        generator.readers._store.save = MagicMock()
+        generator.generate_context()
+        for reader in readers.values():
+            self.assertEqual(reader.read.call_count, 0)
+        self.assertEqual(
+            uncached_articles, [(a.title, a.content) for a in generator.articles]
+        )
+        # nothing changed, so nothing is written
+        generator.readers._store.save.assert_not_called()
+
+    def test_lazy_content_reader_caching(self):
+        """Test that the reader cache keeps its texts in the content store"""
+        for storage in ["pickle", "sqlite"]:
+            settings = self._get_cache_enabled_settings()
+            settings["CACHE_STORAGE"] = storage
+            settings["LAZY_CONTENT"] = True
+            settings["READERS"] = {"asc": None}
+            with self.subTest(storage=storage):
+                uncached_articles = self._generate_lazy_articles(settings)
+                self.assertEqual(
+                    self._generate_lazy_articles(settings), uncached_articles
+                )
+
+    def _generate_lazy_articles(self, settings):
+        context = get_context(settings)
+        context["content_store"] = ContentStore()
+        generator = ArticlesGenerator(
+            context=context,
+            settings=settings,
+            path=CONTENT_DIR,
+            theme=settings["THEME"],
+            output_path=None,
+        )
+        generator.generate_context()
+        # the cache holds the handles of the texts, which are tuples
+        cached = list(generator.readers._cache.values())
+        self.assertTrue(cached)
+        for _, (content, _) in cached:
+            self.assertNotIsInstance(content, str)
+        generator.readers.save_cache()
+        return [(a.title, a.content) for a in generator.articles]
+
+    def test_content_store_forked(self):
+        store = ContentStore()
+        handle = store.put("parent")
+        pipe, child_pipe = multiprocessing.Pipe()
+
+        def child():
+            child_handle = store.put("child")
+            child_pipe.send((store.get(handle), store.get(child_handle)))
+
+        process = multiprocessing.get_context("fork").Process(target=child)
+        process.start()
+        self.assertEqual(pipe.recv(), ("parent", "child"))
+        process.join()
+        # the texts of the child are not written to the file of the parent
+        other_handle = store.put("other")
+        self.assertEqual(store.get(handle), "parent")
+        self.assertEqual(store.get(other_handle), "other")
+
+    def test_sqlite_store_entries(self):
+        """Test that unloadable and unused entries are dropped"""
+        path = os.path.join(self.temp_cache, "store.sqlite")
+        store = SQLiteCacheStore(path, {}, compress=False, fingerprint="f")
+        store.save({"a": 1, "b": 2, "c": 3})
+        store.close()
+
+        # an entry of a class that was removed is a cache miss
+        connection = sqlite3.connect(path)
+        with connection:
+            connection.execute(
+                "UPDATE entries SET data = ? WHERE filename = 'c'",
+                (b"cpelican.removed_module\nRemoved\n.",),
+            )
+        connection.close()
+        store = SQLiteCacheStore(path, {}, compress=False, fingerprint="f")
+        self.assertEqual(store.load("a"), 1)
+        with self.assertRaises(KeyError):
+            store.load("c")
+
+        # only the entries of the files used by the build are kept
+        self.assertEqual(store.count(), 3)
+        store.save({"a": 4}, keep={"a", "c"})
+        store.close()
+        store = SQLiteCacheStore(path, {}, compress=False, fingerprint="f")
+        self.assertEqual(store.load("a"), 4)
+        with self.assertRaises(KeyError):
+            store.load("b")
+        self.assertEqual(store.count(), 2)
+        store.close()
+
+    def test_sqlite_object_caching(self):
+        """Test content object caching in the SQLite cache storage"""
+        settings = self._get_cache_enabled_settings()
+        settings["CACHE_STORAGE"] = "sqlite"
+        settings["CONTENT_CACHING_LAYER"] = "generator"
+        settings["DEFAULT_DATE"] = (1970, 1, 1)
+        settings["READERS"] = {"asc": None}
+        context = get_context(settings)
+
+        generator = ArticlesGenerator(
+            context=context,
+            settings=settings,
+            path=CONTENT_DIR,
+            theme=settings["THEME"],
+            output_path=None,
+        )
+        generator.generate_context()
+
+        context = get_context(settings)
+        generator = ArticlesGenerator(
+            context=context,
+            settings=settings,
+            path=CONTENT_DIR,
+            theme=settings["THEME"],
+            output_path=None,
+        )
+        generator.readers.read_file = MagicMock()
+        generator.generate_context()
+        # the files that were not valid are read again (see
+        # test_article_object_caching)
+        self.assertEqual(generator.readers.read_file.call_count, 7)
+        # the cached objects refer to the settings and context of this build
+        article = generator.articles[0]
+        self.assertIs(article.settings, settings)
+        self.assertIs(article._context, context)
+
+    def test_build_manifest(self):
+        """Test the signatures of the build manifest"""
+        settings = self._get_cache_enabled_settings()
+        settings["INCREMENTAL_BUILD"] = True
+        article = get_article("Title", "Some content")
+        other = get_article("Other", "Other content")
+        context = get_context(settings, articles=[article, other])
+        output = os.path.join(self.temp_cache, "output.html")
+
+        manifest = BuildManifest(settings)
+        signature = manifest.get_signature(None, context, {"article": article})
+        self.assertIsNotNone(signature)
+        self.assertNotEqual(
+            signature, manifest.get_signature(None, context, {"article": other})
+        )
+        # objects of unknown state make the output always written
+        self.assertIsNone(manifest.get_signature(None, context, {"article": object()}))
+
+        class Stateful:
+            def __repr__(self):
+                return "Stateful()"
+
+        self.assertIsNone(
+            manifest.get_signature(None, context, {"article": Stateful()})
+        )
+        self.assertIsNotNone(
+            manifest.get_signature(None, context, {"price": Decimal("1.5")})
+        )
+        # so do those of the context, such as objects added by plugins
+        self.assertIsNone(
+            manifest.get_signature(None, {**context, "plugin": Stateful()}, {})
+        )
+        self.assertIsNone(
+            manifest.get_signature(
+                None,
+                context,
+                {},
+                {"articles": [get_article("T", "C", plugin=Stateful())]},
+            )
+        )
+        self.assertIsNotNone(
+            manifest.get_signature(None, {**context, "content_store": object()}, {})
+        )
+        self.assertFalse(manifest.is_up_to_date(output, signature))
+        manifest.cache_data(output, (signature, False))
+        manifest.save_cache()
+
+        # the output must exist, and its inputs be the same
+        manifest = BuildManifest(settings)
+        self.assertFalse(manifest.is_up_to_date(output, signature))
+        open(output, "w").close()
+        self.assertTrue(manifest.is_up_to_date(output, signature))
+        self.assertTrue(
+            manifest.is_up_to_date(
+                output,
+                manifest.get_signature(
+                    None,
+                    get_context(settings, articles=[article, other]),
+                    {"article": get_article("Title", "Some content")},
+                ),
+            )
+        )
+        self.assertFalse(
+            manifest.is_up_to_date(
+                output,
+                manifest.get_signature(
+                    None,
+                    context,
+                    {"article": get_article("Title", "Some edited content")},
+                ),
+            )
+        )
+        # only the title, location, metadata and summary of the content of
+        # the context matter
+        self.assertFalse(
+            manifest.is_up_to_date(
+                output,
+                manifest.get_signature(
+                    None,
+                    get_context(
+                        settings,
+                        articles=[article, get_article("Renamed", "Other content")],
+                    ),
+                    {"article": article},
+                ),
+            )
+        )
+        self.assertFalse(
+            manifest.is_up_to_date(
+                output,
+                manifest.get_signature(
+                    None,
+                    get_context(
+                        settings,
+                        articles=[article, get_article("Other", "Edited content")],
+                    ),
+                    {"article": article},
+                ),
+            )
+        )
+        self.assertFalse(
+            manifest.is_up_to_date(
+                output,
+                manifest.get_signature(
+                    None,
+                    get_context(
+                        settings,
+                        articles=[
+                            article,
+                            get_article(
+                                "Other", "Other content", date=datetime(2010, 1, 1)
+                            ),
+                        ],
+                    ),
+                    {"article": article},
+                ),
+            )
+        )
+
+        # the text after the summary does not
+        words = " ".join(["word"] * settings["SUMMARY_MAX_LENGTH"])
+        long_context = get_context(
+            settings, articles=[article, get_article("Other", f"{words} end")]
+        )
+        signature = manifest.get_signature(None, long_context, {"article": article})
+        self.assertEqual(
+            signature,
+            manifest.get_signature(
+                None,
+                get_context(
+                    settings, articles=[article, get_article("Other", f"{words} edit")]
+                ),
+                {"article": article},
+            ),
+        )
+
+        # --ignore-cache
+        settings["LOAD_CONTENT_CACHE"] = False
+        manifest = BuildManifest(settings)
+        self.assertFalse(manifest.is_up_to_date(output, signature))
+
+    def test_file_hash_cache(self):
+        """Test that files are only hashed again when they change"""
+        settings = self._get_cache_enabled_settings()
+        settings["CHECK_MODIFIED_METHOD"] = "blake2b"
+        path = os.path.join(self.temp_cache, "file.txt")
+        with open(path, "w") as f:
+            f.write("content")
+        os.utime(path, (0, 0))
+        expected = hashlib.blake2b(b"content").digest()
+
+        def get_digest(file_hashes):
+            with patch("hashlib.file_digest", side_effect=hashlib.file_digest) as hash_:
+                digest = file_hashes.get_digest(path)
+            return digest, hash_.call_count
+
+        file_hashes = FileHashCache(settings)
+        self.assertEqual(get_digest(file_hashes), (expected, 1))
+        self.assertEqual(get_digest(file_hashes), (expected, 0))
+        file_hashes.save_cache()
+        self.assertEqual(get_digest(FileHashCache(settings)), (expected, 0))
+
+        # the digests of another hash are not reused
+        settings["CHECK_MODIFIED_METHOD"] = "sha256"
+        self.assertEqual(
+            get_digest(FileHashCache(settings)),
+            (hashlib.sha256(b"content").digest(), 1),
+        )
+
+        # a modified file is hashed again
+        settings["CHECK_MODIFIED_METHOD"] = "blake2b"
+        with open(path, "w") as f:
+            f.write("modified")
+        expected = hashlib.blake2b(b"modified").digest()
+        file_hashes = FileHashCache(settings)
+        self.assertEqual(get_digest(file_hashes), (expected, 1))
+        file_hashes.save_cache()
+        # but its digest is not reused by the next builds, as the file was
+        # modified too recently to rely on its modification time
+        self.assertEqual(get_digest(FileHashCache(settings)), (expected, 1))
+
+    def test_file_hashes_shared_by_cache_layers(self):
+        """Test that each file is hashed once, by all the cache layers"""
+        settings = self._get_cache_enabled_settings()
+        settings["CHECK_MODIFIED_METHOD"] = "blake2b"
+        settings["PAGE_PATHS"] = ["TestPages"]
+        settings["READERS"] = {"asc": None}
+        hashed = []
+        real_file_digest = hashlib.file_digest
+
+        def file_digest(fileobj, digest):
+            hashed.append(fileobj.name)
+            return real_file_digest(fileobj, digest)
+
+        generator = PagesGenerator(
+            context=get_context(settings),
+            settings=settings,
+            path=CUR_DIR,
+            theme=settings["THEME"],
+            output_path=None,
+            file_hashes=FileHashCache(settings),
+        )
+        with patch("hashlib.file_digest", side_effect=file_digest):
+            generator.generate_context()
+        self.assertTrue(hashed)
+        self.assertEqual(len(hashed), len(set(hashed)))
+
+    def test_file_hashes_of_reader_workers(self):
+        """Test that the digests computed by reader worker processes are
+        used and saved by the main process"""
+        settings = self._get_cache_enabled_settings()
+        settings["CHECK_MODIFIED_METHOD"] = "blake2b"
+        settings["PAGE_PATHS"] = ["TestPages"]
+        settings["READERS"] = {"asc": None}
+        settings["READER_WORKERS"] = 2
+        hashed = []
+        real_file_digest = hashlib.file_digest
+
+        def file_digest(fileobj, digest):
+            # only the calls of this process are recorded
+            hashed.append(fileobj.name)
+            return real_file_digest(fileobj, digest)
+
+        file_hashes = FileHashCache(settings)
+        generator = PagesGenerator(
+            context=get_context(settings),
+            settings=settings,
+            path=CUR_DIR,
+            theme=settings["THEME"],
+            output_path=None,
+            file_hashes=file_hashes,
+        )
+        with patch("hashlib.file_digest", side_effect=file_digest):
+            generator.generate_context()
+        self.assertTrue(generator.pages)
+        self.assertEqual(hashed, [])
+        self.assertTrue(file_hashes._digests)
+        self.assertEqual(set(file_hashes._dirty), set(file_hashes._digests))
@@ -79,3 +79,28 @@ class TestGetConfigFromArgs(unittest.TestCase):
             "TRANSLATION_FEED_RSS_URL": "someurl",
         }
         self.assertDictEqual(config, {**config, **config_must_contain})
+
+    def test_jobs(self):
+        for flag in ["-j", "--jobs"]:
+            config = get_config(parse_arguments([flag, "4"]))
+            self.assertEqual(config["READER_WORKERS"], 4)
+            self.assertEqual(config["WRITER_WORKERS"], 4)
+            self.assertEqual(config["STATIC_WORKERS"], 4)
+
+        config = get_config(parse_arguments([]))
+        self.assertNotIn("READER_WORKERS", config)
+        self.assertNotIn("WRITER_WORKERS", config)
+        self.assertNotIn("STATIC_WORKERS", config)
+
+    def test_profile_options(self):
+        args = parse_arguments([])
+        self.assertFalse(args.profile)
+        self.assertIsNone(args.stats_json)
+        self.assertIsNone(args.cprofile)
+
+        args = parse_arguments(
+            ["--profile", "--stats-json", "stats.json", "--cprofile", "build.prof"]
+        )
+        self.assertTrue(args.profile)
+        self.assertEqual(args.stats_json, "stats.json")
+        self.assertEqual(args.cprofile, "build.prof")
@@ -2,15 +2,19 @@ import datetime
 import locale
 import logging
 import os.path
+import pickle
 from posixpath import join as posix_join
 from sys import platform
+from unittest.mock import patch
 
 from jinja2.utils import generate_lorem_ipsum
 
+from pelican.cache import ContentStore
 from pelican.contents import Article, Author, Category, Page, Static, logger
 from pelican.plugins.signals import content_object_init
 from pelican.settings import DEFAULT_CONFIG
 from pelican.tests.support import LoggedTestCase, get_context, get_settings, unittest
+from pelican.urlwrappers import Tag
 from pelican.utils import path_to_url, posixize_path, truncate_html_words
 
 # generate 3 test paragraphs, each enclosed with <p>
@@ -398,6 +402,59 @@ class TestPage(TestBase):
             ),
         )
 
+    def test_taxonomy_links_are_memoized(self):
+        # the URLs of taxonomy links are resolved once per settings
+        args = self.page_kwargs.copy()
+        args["settings"] = get_settings()
+        args["context"] = {}
+        args["content"] = '<a href="{tag}Tag Name">link</a>'
+        self.assertEqual(
+            Page(**args).get_content("http://notmyidea.org"),
+            '<a href="http://notmyidea.org/tag/tag-name.html">link</a>',
+        )
+        # the memo is not part of the context shared with templates
+        self.assertEqual(args["context"], {})
+
+        with patch.object(Tag, "url", "memo.html"):
+            self.assertEqual(
+                Page(**args).get_content("http://notmyidea.org"),
+                '<a href="http://notmyidea.org/tag/tag-name.html">link</a>',
+            )
+            args["settings"] = get_settings()
+            self.assertEqual(
+                Page(**args).get_content("http://notmyidea.org"),
+                '<a href="http://notmyidea.org/memo.html">link</a>',
+            )
+
+    def test_lazy_content(self):
+        args = self.page_kwargs.copy()
+        args["settings"] = get_settings()
+        args["context"] = {"content_store": ContentStore()}
+        args["content"] = '<a href="{tag}Tag Name">link</a>'
+        page = Page(**args)
+        self.assertIsNone(page._content_text)
+        self.assertEqual(page._content, args["content"])
+
+        expected = '<a href="http://notmyidea.org/tag/tag-name.html">link</a>'
+        self.assertEqual(page.get_content("http://notmyidea.org"), expected)
+        self.assertIn((page, "http://notmyidea.org"), Page.get_content.cache)
+        page.evict_content()
+        self.assertNotIn((page, "http://notmyidea.org"), Page.get_content.cache)
+        self.assertEqual(page.get_content("http://notmyidea.org"), expected)
+
+        # texts set by plugins are stored too
+        page._content = "changed"
+        self.assertIsNone(page._content_text)
+        self.assertEqual(page._content, "changed")
+
+    def test_lazy_content_pickled_with_text(self):
+        args = self.page_kwargs.copy()
+        args["context"] = {"content_store": ContentStore()}
+        page = pickle.loads(pickle.dumps(Page(**args)))
+        self.assertEqual(page._content, args["content"])
+        self.assertIsNone(page._content_text)
+        self.assertIsNot(page._content_store, args["context"]["content_store"])
+
     def test_intrasite_link(self):
         cls_name = "_DummyArticle"
         article = type(cls_name, (object,), {"url": "article.html"})
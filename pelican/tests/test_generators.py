@@ -1,7 +1,11 @@
 import os
+from datetime import datetime
+from operator import attrgetter
 from shutil import copy, rmtree
 from tempfile import mkdtemp
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+
+from jinja2.exceptions import UndefinedError
 
 from pelican.generators import (
     ArticlesGenerator,
@@ -14,6 +18,7 @@ from pelican.generators import (
 from pelican.tests.support import (
     TestCaseWithCLocale,
     can_symlink,
+    get_article,
     get_context,
     get_settings,
     unittest,
@@ -118,6 +123,36 @@ class TestGenerator(TestCaseWithCLocale):
         self.assertEqual(comment_start_string, generator.env.comment_start_string)
         self.assertEqual(comment_end_string, generator.env.comment_end_string)
 
+    def test_jinja_bytecode_cache(self):
+        """Test that compiled templates are saved and reused"""
+        temp_cache = mkdtemp(prefix="pelican_cache.")
+        self.addCleanup(rmtree, temp_cache)
+        settings = get_settings(JINJA_BYTECODE_CACHE=True, CACHE_PATH=temp_cache)
+
+        generator = Generator(
+            settings.copy(), settings, CUR_DIR, settings["THEME"], None
+        )
+        generator.get_template("article")
+        self.assertTrue(os.listdir(os.path.join(temp_cache, "jinja2")))
+
+        generator = Generator(
+            settings.copy(), settings, CUR_DIR, settings["THEME"], None
+        )
+        with patch.object(generator.env, "compile") as compile_:
+            generator.get_template("article")
+        compile_.assert_not_called()
+
+        # templates compiled with other options are not reused
+        settings["JINJA_ENVIRONMENT"] = {"trim_blocks": False}
+        generator = Generator(
+            settings.copy(), settings, CUR_DIR, settings["THEME"], None
+        )
+        with patch.object(
+            generator.env, "compile", wraps=generator.env.compile
+        ) as compile_:
+            generator.get_template("article")
+        compile_.assert_called()
+
     def test_theme_overrides(self):
         """
         Test that the THEME_TEMPLATES_OVERRIDES configuration setting is
@@ -384,6 +419,37 @@ class TestArticlesGenerator(unittest.TestCase):
         ]
         self.assertEqual(sorted(hidden_articles_expected), sorted(self.hidden_articles))
 
+    def test_generate_context_parallel_reading(self):
+        settings = get_settings()
+        settings["DEFAULT_CATEGORY"] = "Default"
+        settings["DEFAULT_DATE"] = (1970, 1, 1)
+        settings["READERS"] = {"asc": None}
+        settings["CACHE_PATH"] = self.temp_cache
+        settings["READER_WORKERS"] = 2
+        context = get_context(settings)
+
+        generator = ArticlesGenerator(
+            context=context,
+            settings=settings,
+            path=CONTENT_DIR,
+            theme=settings["THEME"],
+            output_path=None,
+        )
+        generator.generate_context()
+        self.assertEqual(self.articles, self.distill_articles(generator.articles))
+        self.assertEqual(self.drafts, self.distill_articles(generator.drafts))
+        # failed source paths are recorded in the same order
+        self.assertEqual(
+            [
+                (path, content is None)
+                for path, content in self.generator.context["generated_content"].items()
+            ],
+            [
+                (path, content is None)
+                for path, content in generator.context["generated_content"].items()
+            ],
+        )
+
     def test_generate_categories(self):
         # test for name
         # categories are grouped by slug; if two categories have the same slug
@@ -411,6 +477,24 @@ class TestArticlesGenerator(unittest.TestCase):
         ]
         self.assertEqual(sorted(categories), sorted(categories_expected))
 
+    def test_taxonomy_dates(self):
+        # the articles of each tag, category and author page are sorted by date
+        taxonomies = [
+            (self.generator.generate_tags, self.generator.tags.items()),
+            (self.generator.generate_categories, self.generator.categories),
+            (self.generator.generate_authors, self.generator.authors),
+        ]
+        for generate, groups in taxonomies:
+            write = MagicMock()
+            generate(write)
+            self.assertEqual(
+                [call.kwargs["dates"] for call in write.call_args_list],
+                [
+                    [article for article in self.generator.dates if article in arts]
+                    for _, arts in groups
+                ],
+            )
+
     def test_do_not_use_folder_as_category(self):
         settings = get_settings()
         settings["DEFAULT_CATEGORY"] = "Default"
@@ -662,6 +746,78 @@ class TestArticlesGenerator(unittest.TestCase):
         self.assertEqual(sample_archive["dates"][0].title, dates[0].title)
         self.assertEqual(sample_archive["dates"][0].date, dates[0].date)
 
+    def test_period_archives_grouping(self):
+        """Test the articles, dates and periods of the period archives."""
+        settings = get_settings()
+        settings["CACHE_PATH"] = self.temp_cache
+        settings["YEAR_ARCHIVE_SAVE_AS"] = "{date:%Y}/index.html"
+        settings["YEAR_ARCHIVE_URL"] = "{date:%Y}/"
+        settings["MONTH_ARCHIVE_SAVE_AS"] = "{date:%Y}/{date:%m}/index.html"
+        settings["MONTH_ARCHIVE_URL"] = "{date:%Y}/{date:%m}/"
+        settings["DAY_ARCHIVE_SAVE_AS"] = "{date:%Y}/{date:%m}/{date:%d}/index.html"
+        settings["DAY_ARCHIVE_URL"] = "{date:%Y}/{date:%m}/{date:%d}/"
+        generator = ArticlesGenerator(
+            context=get_context(settings),
+            settings=settings,
+            path=CONTENT_DIR,
+            theme=settings["THEME"],
+            output_path=None,
+        )
+        # the articles list is not in date order
+        articles = [
+            get_article(title, "content", date=datetime(*date))
+            for title, date in [
+                ("a", (2011, 3, 5, 10)),
+                ("b", (2010, 12, 31)),
+                ("c", (2011, 3, 5, 8)),
+                ("d", (2011, 1, 20)),
+                ("e", (2012, 7, 4)),
+                ("f", (2011, 3, 17)),
+            ]
+        ]
+        dates = sorted(articles, key=attrgetter("date"), reverse=True)
+        period_archives = generator._build_period_archives(dates, articles, settings)
+
+        def titles(items):
+            return "".join(item.title for item in items)
+
+        self.assertEqual(
+            {
+                granularity: [
+                    (
+                        archive["period"],
+                        archive["period_num"],
+                        archive["url"],
+                        titles(archive["dates"]),
+                        titles(archive["articles"]),
+                    )
+                    for archive in archives
+                ]
+                for granularity, archives in period_archives.items()
+            },
+            {
+                "year": [
+                    ((2012,), (2012,), "2012/", "e", "e"),
+                    ((2011,), (2011,), "2011/", "facd", "acdf"),
+                    ((2010,), (2010,), "2010/", "b", "b"),
+                ],
+                "month": [
+                    ((2012, "July"), (2012, 7), "2012/07/", "e", "e"),
+                    ((2011, "March"), (2011, 3), "2011/03/", "fac", "acf"),
+                    ((2011, "January"), (2011, 1), "2011/01/", "d", "d"),
+                    ((2010, "December"), (2010, 12), "2010/12/", "b", "b"),
+                ],
+                "day": [
+                    ((2012, "July", 4), (2012, 7, 4), "2012/07/04/", "e", "e"),
+                    ((2011, "March", 17), (2011, 3, 17), "2011/03/17/", "f", "f"),
+                    ((2011, "March", 5), (2011, 3, 5), "2011/03/05/", "ac", "ac"),
+                    ((2011, "January", 20), (2011, 1, 20), "2011/01/20/", "d", "d"),
+                    ((2010, "December", 31), (2010, 12, 31), "2010/12/31/", "b", "b"),
+                ],
+            },
+        )
+        self.assertEqual(period_archives["day"][2]["save_as"], "2011/03/05/index.html")
+
     def test_period_in_timeperiod_archive(self):
         """
         Test that the context of a generated period_archive is passed
@@ -1183,6 +1339,33 @@ class TestTemplatePagesGenerator(TestCaseWithCLocale):
         with open(output_path) as output_file:
             self.assertEqual(output_file.read(), "foo: bar")
 
+    def test_streamed_output_replaced_when_complete(self):
+        settings = get_settings(STREAM_OUTPUT=True)
+        settings["TEMPLATE_PAGES"] = {"template/source.html": "generated/file.html"}
+        template_dir = os.path.join(self.temp_content, "template")
+        os.makedirs(template_dir)
+        with open(os.path.join(template_dir, "source.html"), "w") as template_file:
+            template_file.write("{{ foo }}{{ foo.missing() }}")
+        output_dir = os.path.join(self.temp_output, "generated")
+        os.makedirs(output_dir)
+        with open(os.path.join(output_dir, "file.html"), "w") as output_file:
+            output_file.write("previous")
+
+        generator = TemplatePagesGenerator(
+            context={"foo": "bar"},
+            settings=settings,
+            path=self.temp_content,
+            theme="",
+            output_path=self.temp_output,
+        )
+        with self.assertRaises(UndefinedError):
+            generator.generate_output(Writer(self.temp_output, settings=settings))
+
+        # the previous output is left untouched, and no temporary file remains
+        self.assertEqual(os.listdir(output_dir), ["file.html"])
+        with open(os.path.join(output_dir, "file.html")) as output_file:
+            self.assertEqual(output_file.read(), "previous")
+
 
 class TestStaticGenerator(unittest.TestCase):
     def setUp(self):
@@ -1284,6 +1467,36 @@ class TestStaticGenerator(unittest.TestCase):
             os.path.isfile(os.path.join(self.temp_output, "theme/fonts.css"))
         )
 
+    def test_theme_static_paths_up_to_date(self):
+        """Theme static files are only copied again when they changed."""
+        theme = os.path.join(self.temp_content, "theme")
+        os.makedirs(os.path.join(theme, "static"))
+        source = os.path.join(theme, "static", "style.css")
+        with open(source, "w") as f:
+            f.write("body {}")
+        destination = os.path.join(self.temp_output, "theme", "style.css")
+        settings = get_settings(PATH=self.temp_content)
+        generator = StaticGenerator(
+            context=get_context(settings, staticfiles=[]),
+            settings=settings,
+            path=settings["PATH"],
+            output_path=self.temp_output,
+            theme=theme,
+        )
+
+        generator.generate_output(None)
+        self.assertEqual(os.stat(destination).st_mtime_ns, os.stat(source).st_mtime_ns)
+        with patch("pelican.utils.copy_file") as copy_file:
+            generator.generate_output(None)
+        copy_file.assert_not_called()
+
+        with open(source, "w") as f:
+            f.write("body { margin: 0 }")
+        self.set_ancient_mtime(source)
+        generator.generate_output(None)
+        with open(destination) as f:
+            self.assertEqual(f.read(), "body { margin: 0 }")
+
     def test_static_excludes(self):
         """Test that StaticGenerator respects STATIC_EXCLUDES."""
         settings = get_settings(
@@ -1540,6 +1753,31 @@ class TestStaticGenerator(unittest.TestCase):
         self.assertTrue(os.path.isdir(os.path.join(self.temp_output, "static")))
         self.assertTrue(os.path.isfile(self.endfile))
 
+    def test_parallel_copy(self):
+        for i in range(10):
+            os.makedirs(os.path.join(self.temp_content, "static", str(i)))
+            with open(os.path.join(self.temp_content, "static", str(i), "f"), "w") as f:
+                f.write(f"content {i}")
+        self.settings["STATIC_WORKERS"] = 4
+        self.generator.generate_context()
+        self.generator.generate_output(None)
+        for i in range(10):
+            with open(os.path.join(self.temp_output, "static", str(i), "f")) as f:
+                self.assertEqual(f.read(), f"content {i}")
+
+    def test_parallel_copy_errors_are_raised(self):
+        with open(self.startfile, "w") as f:
+            f.write("staticcontent")
+        with open(self.startfile + "2", "w") as f:
+            f.write("staticcontent")
+        self.settings["STATIC_WORKERS"] = 2
+        self.generator.generate_context()
+        with patch.object(
+            self.generator, "_link_or_copy_staticfile", side_effect=OSError
+        ):
+            with self.assertRaises(OSError):
+                self.generator.generate_output(None)
+
 
 class TestJinja2Environment(TestCaseWithCLocale):
     def setUp(self):
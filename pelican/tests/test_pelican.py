@@ -1,21 +1,29 @@
 import contextlib
+import gzip
 import io
 import locale
 import logging
 import os
 import subprocess
 import sys
+import time
 import unittest
 from collections.abc import Sequence
-from shutil import rmtree
+from shutil import copytree, rmtree
 from tempfile import TemporaryDirectory, mkdtemp
-from unittest.mock import PropertyMock, patch
+from unittest.mock import ANY, PropertyMock, patch
 
 from rich.console import Console
 
 import pelican.readers
-from pelican import Pelican, __version__, main
-from pelican.generators import StaticGenerator
+from pelican import Pelican, __version__, main, profiling
+from pelican.generators import Generator, StaticGenerator
+from pelican.plugins.signals import (
+    content_written,
+    finalized,
+    generator_init,
+    get_generators,
+)
 from pelican.settings import read_settings
 from pelican.tests.support import (
     LoggedTestCase,
@@ -24,6 +32,8 @@ from pelican.tests.support import (
     mute,
     skipIfNoExecutable,
 )
+from pelican.utils import get_file_system_time
+from pelican.writers import ParallelWriter
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 SAMPLES_PATH = os.path.abspath(
@@ -99,6 +109,60 @@ class TestPelican(LoggedTestCase):
             "_get_generator_classes() must return a Sequence to preserve order",
         )
 
+    def test_generators_share_template_environment(self):
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+            },
+        )
+        generators = []
+
+        def on_generator_init(generator):
+            generators.append(generator)
+
+        generator_init.connect(on_generator_init)
+        try:
+            mute(True)(Pelican(settings=settings).run)()
+        finally:
+            generator_init.disconnect(on_generator_init)
+        self.assertGreater(len(generators), 2)
+        self.assertEqual(len({id(generator.env) for generator in generators}), 1)
+
+    def test_plugin_generator_with_own_signature(self):
+        # generators of plugins that do not accept the shared build state
+        # still work
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+            },
+        )
+        generated = []
+
+        class PluginGenerator(Generator):
+            def __init__(self, context, settings, path, theme, output_path):
+                super().__init__(context, settings, path, theme, output_path)
+
+            def generate_output(self, writer):
+                del writer  # Unused argument
+                generated.append(self)
+
+        def on_get_generators(pelican):
+            del pelican  # Unused argument
+            return PluginGenerator
+
+        get_generators.connect(on_get_generators)
+        try:
+            mute(True)(Pelican(settings=settings).run)()
+        finally:
+            get_generators.disconnect(on_get_generators)
+        self.assertEqual(len(generated), 1)
+
     @skipIfNoExecutable(["git", "--version"])
     def test_basic_generation_works(self):
         # when running pelican without settings, it should pick up the default
@@ -121,6 +185,70 @@ class TestPelican(LoggedTestCase):
             level=logging.WARNING,
         )
 
+    @skipIfNoExecutable(["git", "--version"])
+    def test_parallel_generation_works(self):
+        # reading and rendering in worker processes gives the same output
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+                "LOCALE": locale.normalize("en_US"),
+                "READER_WORKERS": 2,
+                "WRITER_WORKERS": 2,
+            },
+        )
+        pelican = Pelican(settings=settings)
+        self.assertIsInstance(pelican._get_writer(), ParallelWriter)
+
+        written = []
+
+        def on_content_written(path, context):
+            del context  # Unused argument
+            written.append(path)
+
+        content_written.connect(on_content_written)
+        try:
+            mute(True)(pelican.run)()
+        finally:
+            content_written.disconnect(on_content_written)
+        self.assertDirsEqual(self.temp_path, os.path.join(OUTPUT_PATH, "basic"))
+        self.assertTrue(written)
+        self.assertTrue(all(os.path.isfile(path) for path in written))
+
+    @skipIfNoExecutable(["git", "--version"])
+    def test_streamed_generation_works(self):
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+                "LOCALE": locale.normalize("en_US"),
+                "STREAM_OUTPUT": True,
+            },
+        )
+        pelican = Pelican(settings=settings)
+        mute(True)(pelican.run)()
+        self.assertDirsEqual(self.temp_path, os.path.join(OUTPUT_PATH, "basic"))
+
+    @skipIfNoExecutable(["git", "--version"])
+    def test_lazy_content_generation_works(self):
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+                "LOCALE": locale.normalize("en_US"),
+                "LAZY_CONTENT": True,
+                "WRITER_WORKERS": 2,
+            },
+        )
+        mute(True)(Pelican(settings=settings).run)()
+        self.assertDirsEqual(self.temp_path, os.path.join(OUTPUT_PATH, "basic"))
+
     @skipIfNoExecutable(["git", "--version"])
     def test_custom_generation_works(self):
         # the same thing with a specified set of settings should work
@@ -162,6 +290,352 @@ class TestPelican(LoggedTestCase):
         mute(True)(pelican.run)()
         self.assertDirsEqual(self.temp_path, os.path.join(OUTPUT_PATH, "custom_locale"))
 
+    def test_skip_unchanged_output(self):
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+                "SKIP_UNCHANGED_OUTPUT": True,
+            },
+        )
+        output = " ".join(mute(True)(Pelican(settings=settings).run)())
+        self.assertRegex(output, r"Wrote \d+ files and left 0 unchanged\.$")
+
+        index = os.path.join(self.temp_path, "index.html")
+        overridden = os.path.join(self.temp_path, "tag", "oh.html")
+        os.utime(index, ns=(0, 0))
+        os.utime(overridden, ns=(0, 0))
+        with open(os.path.join(self.temp_path, "archives.html"), "a") as f:
+            f.write("modified")
+        output = " ".join(mute(True)(Pelican(settings=settings).run)())
+        self.assertRegex(output, r"Wrote 1 file and left \d+ unchanged\.$")
+        self.assertEqual(os.stat(index).st_mtime_ns, 0)
+        # a page overrides tag/oh.html, which is not written twice
+        self.assertEqual(os.stat(overridden).st_mtime_ns, 0)
+        with open(os.path.join(self.temp_path, "archives.html")) as f:
+            self.assertNotIn("modified", f.read())
+
+    def test_skip_unchanged_output_overrides(self):
+        for workers in [1, 2]:
+            content_path = os.path.join(self.temp_cache, f"content-{workers}")
+            output_path = os.path.join(self.temp_cache, f"output-{workers}")
+            copytree(INPUT_PATH, content_path)
+            settings = read_settings(
+                path=None,
+                override={
+                    "PATH": content_path,
+                    "OUTPUT_PATH": output_path,
+                    "CACHE_PATH": os.path.join(self.temp_cache, f"cache-{workers}"),
+                    "SKIP_UNCHANGED_OUTPUT": True,
+                    "WRITER_WORKERS": workers,
+                },
+            )
+            overridden = os.path.join(output_path, "tag", "oh.html")
+            with self.subTest(workers=workers):
+                mute(True)(Pelican(settings=settings).run)()
+                os.utime(overridden, ns=(0, 0))
+                mute(True)(Pelican(settings=settings).run)()
+                self.assertEqual(os.stat(overridden).st_mtime_ns, 0)
+
+                # once the page is gone, the tag page is written again
+                os.remove(os.path.join(content_path, "pages", "override_tag_oh.rst"))
+                mute(True)(Pelican(settings=settings).run)()
+                with open(overridden) as f:
+                    self.assertNotIn("overrides the listening", f.read())
+
+    def test_output_precompress(self):
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+                "OUTPUT_PRECOMPRESS": ["gzip"],
+                "SKIP_UNCHANGED_OUTPUT": True,
+            },
+        )
+        mute(True)(Pelican(settings=settings).run)()
+        for name in ["index.html", "feeds/all.atom.xml", "theme/css/main.css"]:
+            path = os.path.join(self.temp_path, name)
+            with self.subTest(name=name), gzip.open(path + ".gz") as f:
+                with open(path, "rb") as original:
+                    self.assertEqual(f.read(), original.read())
+
+        # the compressed copies of unchanged outputs are not written again
+        compressed = os.path.join(self.temp_path, "index.html.gz")
+        os.utime(compressed, ns=(0, 0))
+        os.utime(os.path.join(self.temp_path, "index.html"), ns=(0, 0))
+        mute(True)(Pelican(settings=settings).run)()
+        self.assertEqual(os.stat(compressed).st_mtime_ns, 0)
+
+    def test_output_staging(self):
+        output_path = os.path.join(self.temp_cache, "output")
+        os.mkdir(output_path)
+        with open(os.path.join(output_path, "live.html"), "w") as f:
+            f.write("served during the build")
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": output_path,
+                "CACHE_PATH": self.temp_cache,
+                "LOCALE": locale.normalize("en_US"),
+                "DELETE_OUTPUT_DIRECTORY": True,
+                "OUTPUT_RETENTION": [".git"],
+                "OUTPUT_STAGING": True,
+            },
+        )
+        os.mkdir(os.path.join(output_path, ".git"))
+        with open(os.path.join(output_path, ".git", "config"), "w") as f:
+            f.write("retained")
+        seen_during_build = []
+
+        def on_finalized(pelican):
+            seen_during_build.append(
+                (
+                    pelican.output_path,
+                    os.path.exists(os.path.join(output_path, "live.html")),
+                )
+            )
+
+        finalized.connect(on_finalized)
+        try:
+            with patch("pelican.link_tree", wraps=pelican.link_tree) as link_tree:
+                mute(True)(Pelican(settings=settings).run)()
+        finally:
+            finalized.disconnect(on_finalized)
+        staging_path = os.path.join(self.temp_cache, ".output.staging")
+        self.assertEqual(seen_during_build, [(staging_path, True)])
+        # the output is deleted, so only the retained files are linked
+        link_tree.assert_called_once_with(output_path, staging_path, [".git"])
+        with open(os.path.join(output_path, ".git", "config")) as f:
+            self.assertEqual(f.read(), "retained")
+        rmtree(os.path.join(output_path, ".git"))
+        self.assertFalse(os.path.exists(staging_path))
+        self.assertFalse(
+            os.path.exists(os.path.join(self.temp_cache, ".output.previous"))
+        )
+        self.assertEqual(settings["OUTPUT_PATH"], output_path)
+        self.assertDirsEqual(output_path, os.path.join(OUTPUT_PATH, "basic"))
+
+        # static files are not copied again: the previous ones are linked
+        settings["DELETE_OUTPUT_DIRECTORY"] = False
+        settings["STATIC_CHECK_IF_MODIFIED"] = True
+        picture = os.path.join(output_path, "pictures", "Fat_Cat.jpg")
+        inode = os.stat(picture).st_ino
+        mute(True)(Pelican(settings=settings).run)()
+        self.assertEqual(os.stat(picture).st_ino, inode)
+        self.assertEqual(os.stat(picture).st_nlink, 1)
+        self.assertDirsEqual(output_path, os.path.join(OUTPUT_PATH, "basic"))
+
+    def test_output_staging_mount_point(self):
+        output_path = os.path.join(self.temp_cache, "output")
+        os.mkdir(output_path)
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": output_path,
+                "CACHE_PATH": self.temp_cache,
+                "OUTPUT_STAGING": True,
+            },
+        )
+        with patch("os.path.ismount", return_value=True):
+            with self.assertRaisesRegex(RuntimeError, "symbolic link"):
+                Pelican(settings=settings).run()
+        self.assertEqual(os.listdir(self.temp_cache), ["output"])
+
+    def test_prune_output(self):
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+                "LOCALE": locale.normalize("en_US"),
+                "DELETE_OUTPUT_DIRECTORY": "prune",
+                "STATIC_CHECK_IF_MODIFIED": True,
+            },
+        )
+        mute(True)(Pelican(settings=settings).run)()
+        self.assertDirsEqual(self.temp_path, os.path.join(OUTPUT_PATH, "basic"))
+
+        orphan = os.path.join(self.temp_path, "removed", "article.html")
+        os.makedirs(os.path.dirname(orphan))
+        with open(orphan, "w") as f:
+            f.write("an article that no longer exists")
+        os.utime(orphan, (0, 0))
+        picture = os.path.join(self.temp_path, "pictures", "Fat_Cat.jpg")
+        # compressed copies of formats no longer in OUTPUT_PRECOMPRESS
+        for stale in [
+            os.path.join(self.temp_path, "index.html.gz"),
+            picture + ".br",
+        ]:
+            with open(stale, "wb") as f:
+                f.write(b"stale")
+        # the files changed in the same tick of the file system clock as the
+        # start of the build are kept
+        while get_file_system_time(self.temp_path) <= os.lstat(stale).st_ctime:
+            time.sleep(0.001)
+        mtime = os.stat(picture).st_mtime_ns
+        mute(True)(Pelican(settings=settings).run)()
+        self.assertFalse(os.path.exists(os.path.dirname(orphan)))
+        # static files that are up to date are kept, not copied again
+        self.assertEqual(os.stat(picture).st_mtime_ns, mtime)
+        self.assertDirsEqual(self.temp_path, os.path.join(OUTPUT_PATH, "basic"))
+
+    def test_output_staging_symlink(self):
+        site_path = os.path.join(self.temp_cache, "site")
+        os.mkdir(site_path)
+        output_path = os.path.join(self.temp_cache, "output")
+        os.symlink(site_path, output_path)
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": output_path,
+                "CACHE_PATH": self.temp_cache,
+                "OUTPUT_STAGING": True,
+            },
+        )
+        for build in ["a", "b", "a"]:
+            mute(True)(Pelican(settings=settings).run)()
+            self.assertEqual(os.readlink(output_path), f".output.build-{build}")
+            self.assertTrue(os.path.isfile(os.path.join(output_path, "index.html")))
+        # the directory the link pointed to is left alone
+        self.assertEqual(os.listdir(site_path), [])
+
+    def test_incremental_build(self):
+        content_path = os.path.join(self.temp_cache, "content")
+        copytree(INPUT_PATH, content_path)
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": content_path,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+                "CACHE_CONTENT": True,
+                "LOAD_CONTENT_CACHE": True,
+                "INCREMENTAL_BUILD": True,
+            },
+        )
+
+        def run_and_list_written_files():
+            # backdate the outputs, to tell which ones get written again
+            for dirpath, _, filenames in os.walk(self.temp_path):
+                for filename in filenames:
+                    os.utime(os.path.join(dirpath, filename), ns=(0, 0))
+            mute(True)(Pelican(settings=settings).run)()
+            return {
+                os.path.relpath(os.path.join(dirpath, filename), self.temp_path)
+                for dirpath, _, filenames in os.walk(self.temp_path)
+                for filename in filenames
+                if os.stat(os.path.join(dirpath, filename)).st_mtime_ns
+            }
+
+        all_files = run_and_list_written_files()
+        self.assertIn("unbelievable.html", all_files)
+        self.assertIn("tag/oh.html", all_files)
+        # including the outputs that override others
+        self.assertEqual(
+            set(), {f for f in run_and_list_written_files() if f.endswith(".html")}
+        )
+
+        with open(os.path.join(content_path, "unbelievable.rst"), "a") as f:
+            f.write("\nSome more content.\n")
+        written = run_and_list_written_files()
+        self.assertIn("unbelievable.html", written)
+        self.assertIn("index.html", written)
+        self.assertIn("category/misc.html", written)
+        self.assertIn("feeds/all.atom.xml", written)
+        self.assertNotIn("oh-yeah.html", written)
+        self.assertNotIn("category/bar.html", written)
+
+    def test_warm_rebuild(self):
+        content_path = os.path.join(self.temp_cache, "content")
+        copytree(INPUT_PATH, content_path)
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": content_path,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": os.path.join(self.temp_cache, "cache"),
+                "WARM_REBUILD": True,
+            },
+        )
+        instance = Pelican(settings=settings)
+        index = os.path.join(self.temp_path, "index.html")
+
+        def run_and_list_read_files():
+            os.utime(index, ns=(0, 0))
+            with patch.object(
+                pelican.readers.RstReader,
+                "read",
+                autospec=True,
+                side_effect=pelican.readers.RstReader.read,
+            ) as read:
+                mute(True)(instance.run)()
+            return {os.path.basename(call.args[1]) for call in read.call_args_list}
+
+        mute(True)(instance.run)()
+        self.assertEqual(run_and_list_read_files(), set())
+        self.assertEqual(os.stat(index).st_mtime_ns, 0)
+
+        with open(os.path.join(content_path, "unbelievable.rst"), "a") as f:
+            f.write("\nSome more content.\n")
+        self.assertEqual(run_and_list_read_files(), {"unbelievable.rst"})
+        self.assertNotEqual(os.stat(index).st_mtime_ns, 0)
+        # nothing is saved to disk
+        self.assertFalse(os.path.exists(settings["CACHE_PATH"]))
+
+    def test_profile_build(self):
+        settings = read_settings(
+            path=None,
+            override={
+                "PATH": INPUT_PATH,
+                "OUTPUT_PATH": self.temp_path,
+                "CACHE_PATH": self.temp_cache,
+                "READER_WORKERS": 2,
+                "WRITER_WORKERS": 2,
+                "OUTPUT_PRECOMPRESS": ["gzip"],
+            },
+        )
+
+        def receiver(sender):
+            del sender  # Unused argument
+
+        finalized.connect(receiver)
+        try:
+            with profiling.profile_build() as profile:
+                mute(True)(Pelican(settings=settings).run)()
+        finally:
+            finalized.disconnect(receiver)
+        self.assertFalse(profiling.is_active())
+
+        report = profile.as_dict()
+        self.assertIn("total", report["phases"])
+        self.assertIn("ArticlesGenerator.generate_context", report["generators"])
+        # the timings of the worker processes are sent back
+        self.assertIn("RstReader", report["readers"])
+        self.assertIn("article.html", report["templates"])
+        self.assertEqual(
+            report["signals"][f"{finalized.name}: {__name__}.{receiver.__qualname__}"],
+            {"wall": ANY, "cpu": ANY, "calls": 1},
+        )
+        self.assertGreater(report["counters"]["files_read"], 0)
+        self.assertGreater(report["counters"]["files_written"], 0)
+        # the copies of static files and the compressed copies are counted
+        self.assertGreaterEqual(
+            report["counters"]["bytes_written"],
+            sum(
+                os.path.getsize(os.path.join(dirpath, filename))
+                for dirpath, _, filenames in os.walk(self.temp_path)
+                for filename in filenames
+            ),
+        )
+
     def test_theme_static_paths_copy(self):
         # the same thing with a specified set of settings should work
         settings = read_settings(
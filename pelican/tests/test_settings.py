@@ -143,6 +143,18 @@ class TestSettingsConfiguration(unittest.TestCase):
     def test_feeds_warning_without_siteurl_or_feed_domain(self):
         self.assertEqual(self._feeds_warning_settings(), 1)
 
+    def test_output_precompress_formats(self):
+        settings = self.settings
+        settings["OUTPUT_PRECOMPRESS"] = "gzip"
+        configure_settings(settings)
+        self.assertEqual(settings["OUTPUT_PRECOMPRESS"], ["gzip"])
+
+        settings["OUTPUT_PRECOMPRESS"] = ["gzip", "lzma"]
+        with self.assertLogs("pelican.settings", logging.WARNING) as logs:
+            configure_settings(settings)
+        self.assertEqual(settings["OUTPUT_PRECOMPRESS"], ["gzip"])
+        self.assertIn("'lzma'", logs.output[0])
+
     def test_theme_settings_exceptions(self):
         settings = self.settings
 
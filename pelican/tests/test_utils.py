@@ -1,10 +1,15 @@
+import fnmatch
+import gzip
 import locale
 import logging
 import os
 import shutil
+import threading
+import time
 from datetime import UTC
 from sys import platform
 from tempfile import mkdtemp
+from unittest.mock import patch
 
 import watchfiles
 
@@ -630,6 +635,52 @@ class TestUtils(LoggedTestCase):
                             self.assertNotIn(a_arts[4], b_arts[5].translations)
                             self.assertNotIn(a_arts[5], b_arts[4].translations)
 
+    def test_process_translations_order_and_warnings(self):
+        def article(slug, lang, **metadata):
+            return get_article(lang=lang, slug=slug, title=slug, content="", **metadata)
+
+        en_c, fr_c = article("ordering-c", "en"), article("ordering-c", "fr")
+        de_a, en_a = article("ordering-a", "de"), article("ordering-a", "en")
+        # two items with the default language in the same group
+        en_b1, en_b2 = article("ordering-b", "en"), article("ordering-b", "en")
+        # only translations in the same group
+        fr_d = article("ordering-d", "fr", translation="true")
+        de_d = article("ordering-d", "de", translation="true")
+
+        index, translations = utils.process_translations(
+            [en_c, fr_c, de_a, en_b1, en_a, en_b2, fr_d, de_d], translation_id="slug"
+        )
+
+        # the groups are sorted by translation id, the items of a group keep
+        # their order
+        self.assertEqual(index, [en_a, en_b1, en_b2, en_c, fr_d, de_d])
+        self.assertEqual(translations, [de_a, fr_c])
+        self.assertEqual(en_a.translations, [de_a])
+        self.assertEqual(de_a.translations, [en_a])
+        self.assertEqual(en_b1.translations, [en_b2])
+        self.assertEqual(fr_d.translations, [de_d])
+
+        self.assertLogCountEqual(
+            count=1,
+            msg='There are 2 items "with slug "ordering-b"" with lang en',
+            level=logging.WARNING,
+        )
+        self.assertLogCountEqual(
+            count=1,
+            msg='There are 2 original \\(not translated\\) items with slug "ordering-b"',
+            level=logging.WARNING,
+        )
+        self.assertLogCountEqual(
+            count=1,
+            msg='All items \\("2"\\) "with slug "ordering-d"" are translations',
+            level=logging.WARNING,
+        )
+        self.assertLogCountEqual(
+            count=1,
+            msg='There are 2 original \\(not translated\\) items with slug "ordering-d"',
+            level=logging.WARNING,
+        )
+
     def test_clean_output_dir(self):
         retention = ()
         test_directory = os.path.join(self.temp_output, "clean_output")
@@ -1053,6 +1104,289 @@ class TestStringUtils(unittest.TestCase):
         self.assertEqual("md", utils.file_suffix("foo.md"))
 
 
+class TestFilenameMatcher(unittest.TestCase):
+    def test_matches_like_fnmatch(self):
+        patterns = ["*.py[co]", "#*#", "[!a]*.md", "**/.*"]
+        matcher = utils.FilenameMatcher(patterns)
+        for name in ["a.pyc", "a.py", "#tmp#", "b.md", "a.md", ".git", "dir/.git"]:
+            with self.subTest(name=name):
+                self.assertEqual(
+                    matcher.matches(name),
+                    any(fnmatch.fnmatch(name, pattern) for pattern in patterns),
+                )
+
+    def test_no_patterns(self):
+        self.assertFalse(utils.FilenameMatcher([]).matches("anything"))
+        self.assertFalse(utils.get_filename_matcher(None).matches("anything"))
+
+    def test_shared_matchers(self):
+        matcher = utils.get_filename_matcher(["*.tmp"])
+        self.assertIs(utils.get_filename_matcher(["*.tmp"]), matcher)
+        self.assertIsNot(utils.get_filename_matcher(["*.bak"]), matcher)
+
+
+class TestLinkTree(unittest.TestCase):
+    def setUp(self):
+        self.temp_path = mkdtemp(prefix="pelicantests.")
+        self.source = os.path.join(self.temp_path, "source")
+        os.makedirs(os.path.join(self.source, "dir"))
+        with open(os.path.join(self.source, "dir", "file.html"), "w") as f:
+            f.write("content")
+        os.symlink("dir", os.path.join(self.source, "link"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_path)
+
+    def test_link_tree(self):
+        destination = os.path.join(self.temp_path, "destination")
+        utils.link_tree(self.source, destination)
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(self.source, "dir", "file.html"),
+                os.path.join(destination, "dir", "file.html"),
+            )
+        )
+        self.assertEqual(os.readlink(os.path.join(destination, "link")), "dir")
+
+    def test_link_tree_names(self):
+        destination = os.path.join(self.temp_path, "destination")
+        utils.link_tree(self.source, destination, ["link", "missing"])
+        self.assertEqual(os.listdir(destination), ["link"])
+
+    def test_exchange_paths(self):
+        other = os.path.join(self.temp_path, "other")
+        os.mkdir(other)
+        if not utils.exchange_paths(self.source, other):
+            self.skipTest("renameat2() not supported")
+        self.assertEqual(os.listdir(self.source), [])
+        self.assertTrue(os.path.isfile(os.path.join(other, "dir", "file.html")))
+
+    def test_unlink_if_linked(self):
+        destination = os.path.join(self.temp_path, "destination")
+        utils.link_tree(self.source, destination)
+        linked = os.path.join(destination, "dir", "file.html")
+        utils.unlink_if_linked(linked)
+        self.assertFalse(os.path.exists(linked))
+        # the other link is left, and is no longer linked
+        source = os.path.join(self.source, "dir", "file.html")
+        utils.unlink_if_linked(source)
+        self.assertTrue(os.path.exists(source))
+
+
+class TestPruneOutputDir(unittest.TestCase):
+    def setUp(self):
+        self.temp_output = mkdtemp(prefix="pelicantests.")
+        for name in [
+            "index.html",
+            "index.html.gz",
+            "old.html",
+            "old.html.gz",
+            "gone/page.html",
+            "gone/deeper/page.html",
+            ".git/config",
+        ]:
+            self._write(name)
+        # the time of the file system is coarse
+        changed = os.lstat(os.path.join(self.temp_output, ".git", "config")).st_ctime
+        self.since = utils.get_file_system_time(self.temp_output)
+        while self.since <= changed:
+            time.sleep(0.001)
+            self.since = utils.get_file_system_time(self.temp_output)
+        self._write("recent.html")
+        # copied during the build, with the modification time of its source
+        shutil.copy2(
+            os.path.join(self.temp_output, "old.html"),
+            os.path.join(self.temp_output, "copied.html"),
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_output)
+
+    def _write(self, name):
+        path = os.path.join(self.temp_output, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(name)
+        os.utime(path, (1, 1))
+
+    def test_prune_output_dir(self):
+        pruned = utils.prune_output_dir(
+            self.temp_output,
+            [
+                os.path.join(self.temp_output, "index.html"),
+                os.path.join(self.temp_output, "index.html.gz"),
+            ],
+            [".git"],
+            since=self.since,
+        )
+        self.assertEqual(pruned, 4)
+        remaining = {
+            os.path.relpath(os.path.join(dirpath, filename), self.temp_output)
+            for dirpath, _, filenames in os.walk(self.temp_output)
+            for filename in filenames
+        }
+        self.assertEqual(
+            remaining,
+            {
+                "index.html",
+                "index.html.gz",
+                "recent.html",
+                "copied.html",
+                os.path.join(".git", "config"),
+            },
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.temp_output, "gone")))
+
+    def test_get_file_system_time(self):
+        files = set(os.listdir(self.temp_output))
+        self.assertGreater(
+            utils.get_file_system_time(self.temp_output),
+            os.lstat(os.path.join(self.temp_output, ".git", "config")).st_ctime,
+        )
+        self.assertEqual(set(os.listdir(self.temp_output)), files)
+        self.assertEqual(
+            utils.get_file_system_time(os.path.join(self.temp_output, "missing")), 0
+        )
+
+
+class TestOutputCompressor(unittest.TestCase):
+    def setUp(self):
+        self.temp_output = mkdtemp(prefix="pelicantests.")
+        self.path = os.path.join(self.temp_output, "index.html")
+        self.data = b"<html>Hello</html>" * 100
+        with open(self.path, "wb") as f:
+            f.write(self.data)
+        self.compressor = utils.OutputCompressor(
+            {"OUTPUT_PRECOMPRESS": ["gzip"], "OUTPUT_PRECOMPRESS_EXTENSIONS": [".html"]}
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_output)
+
+    def test_compress(self):
+        self.compressor.compress(self.path, self.data)
+        self.compressor.wait()
+        with gzip.open(self.path + ".gz") as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(
+            os.stat(self.path + ".gz").st_mtime_ns, os.stat(self.path).st_mtime_ns
+        )
+        # no temporary file is left over
+        self.assertEqual(
+            set(os.listdir(self.temp_output)), {"index.html", "index.html.gz"}
+        )
+
+    def test_overridden_file_compressed_once_at_a_time(self):
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def compress(*args):
+            calls.append(args[1])
+            started.set()
+            release.wait(5)
+
+        with patch.object(self.compressor, "_compress", side_effect=compress):
+            self.compressor.compress(self.path, b"first")
+            self.assertTrue(started.wait(5))
+            # written again while compressed, and overridden before its turn
+            self.compressor.compress(self.path, b"second")
+            self.compressor.compress(self.path, b"third")
+            release.set()
+            self.compressor.wait()
+        self.assertEqual(calls, [b"first", b"third"])
+
+    def test_compressed_paths(self):
+        self.assertEqual(self.compressor.compressed_paths("a.html"), ["a.html.gz"])
+        self.assertEqual(self.compressor.compressed_paths("a.png"), [])
+
+    def test_other_extensions_not_compressed(self):
+        path = os.path.join(self.temp_output, "image.png")
+        with open(path, "wb") as f:
+            f.write(self.data)
+        self.compressor.compress(path, self.data)
+        self.compressor.wait()
+        self.assertFalse(os.path.exists(path + ".gz"))
+
+    def test_up_to_date_copies_not_rewritten(self):
+        self.compressor.compress(self.path)
+        self.compressor.wait()
+        with open(self.path + ".gz", "ab") as f:
+            f.write(b"marker")
+        mtime = os.stat(self.path).st_mtime_ns
+        os.utime(self.path + ".gz", ns=(mtime, mtime))
+
+        self.compressor.compress(self.path, changed=False)
+        self.compressor.wait()
+        with open(self.path + ".gz", "rb") as f:
+            self.assertTrue(f.read().endswith(b"marker"))
+
+        os.utime(self.path, ns=(0, 0))
+        self.compressor.compress(self.path, changed=False)
+        self.compressor.wait()
+        with gzip.open(self.path + ".gz") as f:
+            self.assertEqual(f.read(), self.data)
+
+
+class TestFileIndex(unittest.TestCase):
+    def setUp(self):
+        self.content = os.path.join(os.path.dirname(__file__), "content")
+
+    def test_walk_like_os_walk(self):
+        def sorted_walk(walk):
+            return sorted(
+                (path, sorted(dirs), sorted(files)) for path, dirs, files in walk
+            )
+
+        self.assertEqual(
+            sorted_walk(utils.FileIndex().walk(self.content)),
+            sorted_walk(os.walk(self.content, followlinks=True)),
+        )
+
+    def test_directories_scanned_once(self):
+        index = utils.FileIndex()
+        with patch("os.scandir", side_effect=os.scandir) as scandir:
+            list(index.walk(self.content))
+            scanned = scandir.call_count
+            list(index.walk(self.content))
+            list(index.walk(os.path.join(self.content, "TestCategory")))
+        self.assertEqual(scandir.call_count, scanned)
+
+    def test_stat_cached(self):
+        index = utils.FileIndex()
+        list(index.walk(self.content))
+        path = os.path.join(self.content, "article.rst")
+        with patch("os.stat", side_effect=os.stat) as stat:
+            self.assertEqual(index.stat(path), os.stat(path))
+            # the entry of the scanned directory caches the stat result
+            self.assertEqual(
+                index.stat(os.path.join(self.content, ".", "article.rst")),
+                index.stat(path),
+            )
+        self.assertEqual(stat.call_count, 1)  # the call of the test
+        self.assertEqual((index.stat_calls, index.stat_hits), (3, 2))
+
+        # files out of the scanned directories are stat'ed once
+        with patch("os.stat", side_effect=os.stat) as stat:
+            index.stat(__file__)
+            index.stat(__file__)
+        self.assertEqual(stat.call_count, 1)
+
+        with self.assertRaises(FileNotFoundError):
+            index.stat(os.path.join(self.content, "missing.rst"))
+
+    def test_pruned_directories_not_walked(self):
+        walked = []
+        for path, dirs, _ in utils.FileIndex().walk(self.content):
+            walked.append(path)
+            dirs.clear()
+        self.assertEqual(walked, [self.content])
+        # the index itself is not modified
+        self.assertIn(
+            os.path.join(self.content, "TestCategory"),
+            [path for path, _, _ in utils.FileIndex().walk(self.content)],
+        )
+
+
 class TestFileChangeFilter(unittest.TestCase):
     ignore_file_patterns = DEFAULT_CONFIG["IGNORE_FILES"]
 
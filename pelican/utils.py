@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import ctypes
 import datetime
+import errno
 import fnmatch
+import gzip
 import locale
 import logging
+import multiprocessing
 import os
 import pathlib
 import re
 import shutil
+import stat
+import sys
+import tempfile
+import threading
 import traceback
 import unicodedata
 import urllib
@@ -17,10 +25,12 @@ from collections.abc import (
     Generator,
     Hashable,
     Iterable,
+    Iterator,
     Sequence,
 )
-from contextlib import contextmanager
-from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
+from functools import lru_cache, partial
 from html import entities
 from html.parser import HTMLParser
 from itertools import groupby
@@ -38,9 +48,26 @@ try:
     from zoneinfo import ZoneInfo
 except ModuleNotFoundError:
     from backports.zoneinfo import ZoneInfo
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import brotli
+except ImportError:
+    brotli = False
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = False
 import watchfiles
 from markupsafe import Markup
 
+from pelican import profiling
+
 if TYPE_CHECKING:
     from pelican.contents import Content
     from pelican.settings import Settings
@@ -292,38 +319,172 @@ def slugify(
     return value.strip()
 
 
-def copy(source: str, destination: str, ignores: Iterable[str] | None = None) -> None:
+class FilenameMatcher:
+    """Match file names against glob patterns, like :func:`fnmatch.fnmatch`.
+
+    The patterns are compiled into a single regular expression, and the
+    results are cached, as the same directory and file names are matched many
+    times in a build. Use :func:`get_filename_matcher` to share matchers.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns = tuple(patterns)
+        regexps = [fnmatch.translate(os.path.normcase(p)) for p in self.patterns]
+        self._regexp = re.compile("|".join(regexps)) if regexps else None
+        self._cache: dict[str, bool] = {}
+
+    def matches(self, name: str) -> bool:
+        """Return True if name matches one of the patterns."""
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        matched = self._regexp is not None and bool(
+            self._regexp.match(os.path.normcase(name))
+        )
+        self._cache[name] = matched
+        return matched
+
+
+@lru_cache
+def _get_filename_matcher(patterns: tuple[str, ...]) -> FilenameMatcher:
+    return FilenameMatcher(patterns)
+
+
+def get_filename_matcher(patterns: Iterable[str] | None) -> FilenameMatcher:
+    """Return the shared FilenameMatcher of a list of glob patterns, such as
+    the IGNORE_FILES setting."""
+    return _get_filename_matcher(tuple(patterns or ()))
+
+
+class FileIndex:
+    """In-memory index of directory trees, shared by the generators of a
+    build (see Pelican.run), so that each directory is scanned only once
+    even when the paths of several generators overlap.
+
+    Directories are listed with :func:`os.scandir` the first time they are
+    walked. The index also caches the stat results of files (see
+    :meth:`stat`), as the files do not change during a build.
+    """
+
+    def __init__(self) -> None:
+        # normalized directory path -> (subdirectory names, file entries)
+        self._listings: dict[str, tuple[list[str], dict[str, os.DirEntry]]] = {}
+        # normalized file path -> stat result
+        self._stats: dict[str, os.stat_result] = {}
+        self.stat_calls = 0
+        self.stat_hits = 0
+
+    def _list(self, dirpath: str) -> tuple[list[str], dict[str, os.DirEntry]]:
+        key = os.path.normpath(dirpath)
+        try:
+            return self._listings[key]
+        except KeyError:
+            pass
+        dirs: list[str] = []
+        files: dict[str, os.DirEntry] = {}
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    try:
+                        # like os.walk(followlinks=True), links to
+                        # directories are directories
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        dirs.append(entry.name)
+                    else:
+                        files[entry.name] = entry
+        except OSError:
+            # like os.walk, directories that cannot be listed are skipped
+            pass
+        self._listings[key] = dirs, files
+        return dirs, files
+
+    def stat(self, path: str) -> os.stat_result:
+        """Return the stat result of a file, like :func:`os.stat`.
+
+        The result is cached. The entries of the scanned directories are used
+        where possible, which saves the system call on some platforms.
+        """
+        key = os.path.normpath(path)
+        self.stat_calls += 1
+        try:
+            result = self._stats[key]
+        except KeyError:
+            pass
+        else:
+            self.stat_hits += 1
+            return result
+        dirpath, name = os.path.split(key)
+        listing = self._listings.get(dirpath)
+        entry = listing[1].get(name) if listing is not None else None
+        result = entry.stat() if entry is not None else os.stat(path)
+        self._stats[key] = result
+        return result
+
+    def walk(self, top: str) -> Iterator[tuple[str, list[str], list[str]]]:
+        """Walk a directory tree like ``os.walk(top, followlinks=True)``.
+
+        Subdirectory names removed from the yielded lists are not walked.
+        """
+        dirs, files = self._list(top)
+        dirs = list(dirs)
+        yield top, dirs, list(files)
+        for name in dirs:
+            yield from self.walk(os.path.join(top, name))
+
+
+def copy(
+    source: str,
+    destination: str,
+    ignores: Iterable[str] | None = None,
+    only_modified: bool = False,
+) -> list[str]:
     """Recursively copy source into destination.
 
     If source is a file, destination has to be a file as well.
     The function is able to copy either files or directories.
+    Return the paths of the destination files, copied or up to date.
 
     :param source: the source file or directory
     :param destination: the destination file or directory
     :param ignores: either None, or a list of glob patterns;
         files matching those patterns will _not_ be copied.
+    :param only_modified: if True, the modification times of the files are
+        copied too, and files whose copy has the same size and modification
+        time are not copied again.
     """
 
+    copied = []
+
+    def copy_one(src_path, dst_path):
+        copied.append(dst_path)
+        if only_modified and is_copy_up_to_date(src_path, dst_path):
+            logger.debug("%s is up to date, not copying", dst_path)
+            return
+        logger.info("Copying %s to %s", src_path, dst_path)
+        copy_file(src_path, dst_path, preserve_mtime=only_modified)
+
     def walk_error(err):
         logger.warning("While copying %s: %s: %s", source_, err.filename, err.strerror)
 
     source_ = os.path.abspath(os.path.expanduser(source))
     destination_ = os.path.abspath(os.path.expanduser(destination))
 
-    if ignores is None:
-        ignores = []
+    ignore_matcher = get_filename_matcher(ignores)
 
-    if any(fnmatch.fnmatch(os.path.basename(source), ignore) for ignore in ignores):
+    if ignore_matcher.matches(os.path.basename(source)):
         logger.info("Not copying %s due to ignores", source_)
-        return
+        return copied
 
     if os.path.isfile(source_):
         dst_dir = os.path.dirname(destination_)
         if not os.path.exists(dst_dir):
             logger.info("Creating directory %s", dst_dir)
             os.makedirs(dst_dir)
-        logger.info("Copying %s to %s", source_, destination_)
-        copy_file(source_, destination_)
+        copy_one(source_, destination_)
 
     elif os.path.isdir(source_):
         if not os.path.exists(destination_):
@@ -333,17 +494,13 @@ def copy(source: str, destination: str, ignores: Iterable[str] | None = None) ->
             logger.warning(
                 "Cannot copy %s (a directory) to %s (a file)", source_, destination_
             )
-            return
+            return copied
 
         for src_dir, subdirs, others in os.walk(source_, followlinks=True):
             dst_dir = os.path.join(destination_, os.path.relpath(src_dir, source_))
 
-            subdirs[:] = (
-                s for s in subdirs if not any(fnmatch.fnmatch(s, i) for i in ignores)
-            )
-            others[:] = (
-                o for o in others if not any(fnmatch.fnmatch(o, i) for i in ignores)
-            )
+            subdirs[:] = (s for s in subdirs if not ignore_matcher.matches(s))
+            others[:] = (o for o in others if not ignore_matcher.matches(o))
 
             if not os.path.isdir(dst_dir):
                 logger.info("Creating directory %s", dst_dir)
@@ -354,8 +511,7 @@ def copy(source: str, destination: str, ignores: Iterable[str] | None = None) ->
                 src_path = os.path.join(src_dir, o)
                 dst_path = os.path.join(dst_dir, o)
                 if os.path.isfile(src_path):
-                    logger.info("Copying %s to %s", src_path, dst_path)
-                    copy_file(src_path, dst_path)
+                    copy_one(src_path, dst_path)
                 else:
                     logger.warning(
                         "Skipped copy %s (not a file or directory) to %s",
@@ -363,17 +519,317 @@ def copy(source: str, destination: str, ignores: Iterable[str] | None = None) ->
                         dst_path,
                     )
 
+    return copied
+
+
+def unlink_if_linked(path: str) -> None:
+    """Remove the file at path if it has other hard links, so that writing a
+    new file there leaves the other links untouched.
+
+    Output files may be linked to source files (see STATIC_CREATE_LINKS) or to
+    the files of the previous output (see OUTPUT_STAGING).
+    """
+    try:
+        if os.lstat(path).st_nlink > 1:
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def link_tree(
+    source: str, destination: str, names: Iterable[str] | None = None
+) -> None:
+    """Recreate the directory tree of source as destination, with hard links
+    to the files of source (copies where they cannot be linked), and copies of
+    its symbolic links. If names is given, only these top-level files and
+    directories of source are linked."""
+    os.makedirs(destination, exist_ok=True)
+    for dirpath, dirnames, filenames in os.walk(source):
+        if names is not None and dirpath == source:
+            dirnames[:] = [d for d in dirnames if d in names]
+            filenames = [f for f in filenames if f in names]
+        target = os.path.join(destination, os.path.relpath(dirpath, source))
+        for name in list(dirnames):
+            if os.path.islink(os.path.join(dirpath, name)):
+                # not walked: copied as links, with the files below
+                dirnames.remove(name)
+                filenames.append(name)
+            else:
+                os.makedirs(os.path.join(target, name), exist_ok=True)
+        for name in filenames:
+            src, dst = os.path.join(dirpath, name), os.path.join(target, name)
+            if os.path.islink(src):
+                os.symlink(os.readlink(src), dst)
+                continue
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+
+
+@lru_cache
+def _get_renameat2() -> Callable[..., int] | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (AttributeError, OSError):  # libc older than glibc 2.28
+        return None
+    renameat2.argtypes = [
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_uint,
+    ]
+    renameat2.restype = ctypes.c_int
+    return renameat2
+
+
+def exchange_paths(path: str, other: str) -> bool:
+    """Atomically exchange two files or directories of the same file system,
+    and return True, or return False if the system cannot (it takes the
+    renameat2() call of Linux)."""
+    renameat2 = _get_renameat2()
+    if renameat2 is None:
+        return False
+    at_fdcwd, rename_exchange = -100, 2
+    if not renameat2(
+        at_fdcwd, os.fsencode(path), at_fdcwd, os.fsencode(other), rename_exchange
+    ):
+        return True
+    error = ctypes.get_errno()
+    if error in (errno.ENOSYS, errno.EINVAL):  # not supported by the file system
+        return False
+    raise OSError(error, os.strerror(error), path, None, other)
+
+
+def is_copy_up_to_date(source: str, destination: str) -> bool:
+    """Return True if destination is a file with the same size and
+    modification time as source, such as a copy made by copy_file() with
+    preserve_mtime=True."""
+    try:
+        source_stat = os.stat(source)
+        destination_stat = os.stat(destination)
+    except OSError:
+        return False
+    return (
+        stat.S_ISREG(destination_stat.st_mode)
+        and destination_stat.st_size == source_stat.st_size
+        and destination_stat.st_mtime_ns == source_stat.st_mtime_ns
+    )
+
+
+# ioctl cloning a file, on the Linux filesystems that support reflinks such as
+# Btrfs and XFS
+_FICLONE = 0x40049409
+
+
+def _copy_file_data(source: str, destination: str) -> None:
+    """Copy the data of a file like shutil.copyfile(), without reading it
+    where possible.
+
+    On Linux, the data is cloned (reflink) if the filesystem supports it, and
+    copied in the kernel otherwise, which lets network filesystems copy it
+    on the server side.
+    """
+    with open(source, "rb") as fsrc:
+        try:
+            if os.path.samestat(os.fstat(fsrc.fileno()), os.stat(destination)):
+                raise shutil.SameFileError(
+                    f"{source!r} and {destination!r} are the same file"
+                )
+        except FileNotFoundError:
+            pass
+        unlink_if_linked(destination)
+        if fcntl is None or not hasattr(os, "copy_file_range"):
+            shutil.copyfile(source, destination)
+            return
+        with open(destination, "wb") as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+                return
+            except OSError:
+                pass
+            try:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 2**30):
+                    pass
+                return
+            except OSError:
+                # not supported between these files: copy from the start
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst)
+
 
-def copy_file(source: str, destination: str) -> None:
-    """Copy a file"""
+def copy_file(source: str, destination: str, preserve_mtime: bool = False) -> None:
+    """Copy a file, and its modification time if preserve_mtime is True"""
     try:
-        shutil.copyfile(source, destination)
+        _copy_file_data(source, destination)
+        source_stat = os.stat(source)
+        if preserve_mtime:
+            os.utime(destination, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        profiling.count("bytes_written", source_stat.st_size)
     except OSError as e:
         logger.warning(
             "A problem occurred copying file %s to %s; %s", source, destination, e
         )
 
 
+def _compress_gzip(data: bytes) -> bytes:
+    # without a timestamp, so that the same data gives the same file
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _compress_brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+def _compress_zstd(data: bytes) -> bytes:
+    return zstd.compress(data, level=19)
+
+
+# the formats of OUTPUT_PRECOMPRESS, with the extension of the compressed files
+# and the compression function, if the module they need is installed
+PRECOMPRESS_FORMATS = {
+    name: (extension, function)
+    for name, extension, function, available in (
+        ("gzip", ".gz", _compress_gzip, True),
+        ("brotli", ".br", _compress_brotli, brotli),
+        ("zstd", ".zst", _compress_zstd, zstd),
+    )
+    if available
+}
+
+
+class OutputCompressor:
+    """Write compressed copies of output files next to them, such as
+    ``index.html.gz`` (see OUTPUT_PRECOMPRESS).
+
+    The files are compressed by a pool of threads, unless threaded is False;
+    wait() must be called once they are all submitted. The compressed copies
+    are written to temporary files renamed once complete, so that they are
+    never seen partially written, and are given the modification time of the
+    file, which tells whether they are up to date.
+    """
+
+    def __init__(self, settings: Settings, threaded: bool = True) -> None:
+        self.formats = [
+            PRECOMPRESS_FORMATS[name] for name in settings.get("OUTPUT_PRECOMPRESS", ())
+        ]
+        self.extensions = tuple(settings.get("OUTPUT_PRECOMPRESS_EXTENSIONS", ()))
+        self._threaded = threaded
+        self._executor = None
+        self._futures = []
+        self._lock = threading.Lock()
+        # path -> (data, changed) of the files waiting to be compressed, and
+        # the paths being compressed by a thread
+        self._queued = {}
+        self._running = set()
+
+    def compressed_paths(self, path: str) -> list[str]:
+        """Return the paths of the compressed copies of the file at path."""
+        if not path.endswith(self.extensions):
+            return []
+        return [path + extension for extension, _ in self.formats]
+
+    def compress(
+        self, path: str, data: bytes | None = None, changed: bool = True
+    ) -> None:
+        """Write the compressed copies of the file at path, if it is to be
+        compressed.
+
+        data is the content of the file; it is read from the file if None and
+        needed. Unless changed is True, only the compressed copies that are
+        missing or out of date are written.
+        """
+        if not self.formats or not path.endswith(self.extensions):
+            return
+        if not self._threaded:
+            self._compress(path, data, changed)
+            return
+        with self._lock:
+            # only the last version of a file written several times (i.e.
+            # overridden) is compressed, by one thread at a time
+            previous = self._queued.get(path)
+            if previous is not None:
+                changed = changed or previous[1]
+            self._queued[path] = (data, changed)
+            if path in self._running:
+                return
+            self._running.add(path)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor()
+            self._futures.append(self._executor.submit(self._compress_queued, path))
+
+    def _compress_queued(self, path: str) -> None:
+        while True:
+            with self._lock:
+                request = self._queued.pop(path, None)
+                if request is None:
+                    self._running.discard(path)
+                    return
+            try:
+                self._compress(path, *request)
+            except BaseException:
+                with self._lock:
+                    self._running.discard(path)
+                raise
+
+    def _compress(self, path: str, data: bytes | None, changed: bool) -> None:
+        try:
+            path_stat = os.stat(path)
+        except OSError:
+            return
+        todo = [
+            (path + extension, function)
+            for extension, function in self.formats
+            if changed or not self._is_up_to_date(path + extension, path_stat)
+        ]
+        if todo and data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        for compressed_path, function in todo:
+            compressed = function(data)
+            dirname, basename = os.path.split(compressed_path)
+            temp_path = os.path.join(dirname, f".{basename}.{os.getpid()}.tmp")
+            try:
+                with open(temp_path, "wb") as f:
+                    f.write(compressed)
+                os.utime(temp_path, ns=(path_stat.st_atime_ns, path_stat.st_mtime_ns))
+                os.replace(temp_path, compressed_path)
+            except BaseException:
+                with suppress(OSError):
+                    os.unlink(temp_path)
+                raise
+            profiling.count("bytes_written", len(compressed))
+
+    @staticmethod
+    def _is_up_to_date(compressed_path: str, path_stat: os.stat_result) -> bool:
+        try:
+            return os.stat(compressed_path).st_mtime_ns == path_stat.st_mtime_ns
+        except OSError:
+            return False
+
+    def wait(self) -> None:
+        """Wait for the submitted files to be compressed, and stop the
+        threads. Raise the first error, if any."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            futures, self._futures = self._futures, []
+        if executor is None:
+            return
+        try:
+            for future in futures:
+                future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+            with self._lock:
+                self._queued.clear()
+                self._running.clear()
+
+
 def clean_output_dir(path: str, retention: Iterable[str]) -> None:
     """Remove all files from output directory except those in retention list"""
 
@@ -411,6 +867,90 @@ def clean_output_dir(path: str, retention: Iterable[str]) -> None:
             logger.error("Unable to delete %s, file type unknown", file)
 
 
+def get_file_system_time(path: str) -> float:
+    """Return the current time of the file system of the directory at path,
+    as the status change time (st_ctime) of a file created there, or 0 if
+    the directory does not exist: all its files are then newer."""
+    try:
+        with tempfile.TemporaryFile(dir=path) as f:
+            return os.fstat(f.fileno()).st_ctime
+    except FileNotFoundError:
+        return 0
+
+
+def prune_output_dir(
+    path: str,
+    keep: Iterable[str],
+    retention: Iterable[str],
+    since: float | None = None,
+) -> int:
+    """Remove from the output directory the files that are not in keep, then
+    the directories left empty, and return the number of files removed.
+
+    The top-level files and directories in the retention list are left
+    untouched, as are the files changed since the given file system time (see
+    get_file_system_time()), such as files written by plugins.
+    """
+    keep = {os.path.normpath(os.path.abspath(p)) for p in keep}
+    retention = set(retention)
+    path = os.path.normpath(os.path.abspath(path))
+
+    orphans = []
+    for dirpath, dirnames, filenames in os.walk(path):
+        if dirpath == path:
+            dirnames[:] = [d for d in dirnames if d not in retention]
+            filenames = [f for f in filenames if f not in retention]
+        # symbolic links to directories are removed like files
+        filenames += [d for d in dirnames if os.path.islink(os.path.join(dirpath, d))]
+        for filename in filenames:
+            file_path = os.path.join(dirpath, filename)
+            if file_path in keep:
+                continue
+            try:
+                # the status change time is set by any write, even of a copy
+                # given the modification time of its source; on Windows, it
+                # is the creation time
+                file_stat = os.lstat(file_path)
+                if since is not None and (
+                    max(file_stat.st_ctime, file_stat.st_mtime) >= since
+                ):
+                    continue
+            except FileNotFoundError:
+                continue
+            orphans.append(file_path)
+
+    def remove(file_path):
+        try:
+            os.unlink(file_path)
+            logger.debug("Deleted orphaned file %s", file_path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.exception("Unable to delete file %s", file_path)
+
+    if len(orphans) > 1:
+        # deleting files is mostly waiting for the file system
+        with ThreadPoolExecutor() as executor:
+            for _ in executor.map(remove, orphans):
+                pass
+    else:
+        for file_path in orphans:
+            remove(file_path)
+
+    # remove the directories left empty, deepest first
+    directories = set()
+    for file_path in orphans:
+        dirpath = os.path.dirname(file_path)
+        while dirpath != path and dirpath not in directories:
+            directories.add(dirpath)
+            dirpath = os.path.dirname(dirpath)
+    for dirpath in sorted(directories, key=len, reverse=True):
+        with suppress(OSError):
+            os.rmdir(dirpath)
+
+    return len(orphans)
+
+
 def get_relative_path(path: str) -> str:
     """Return the relative path from the given path to the root path."""
     components = split_all(path)
@@ -734,9 +1274,12 @@ def process_translations(
         original_items = get_original_items(items, with_str)
         index.extend(original_items)
         for a in items:
-            a.translations = [x for x in items if x != a]
+            a.translations = [x for x in items if x is not a]
 
-    translations = [x for x in content_list if x not in index]
+    # content objects compare by identity; a set of ids avoids testing the
+    # membership of each item in the index list
+    original_ids = {id(x) for x in index}
+    translations = [x for x in content_list if id(x) not in original_ids]
 
     return index, translations
 
@@ -847,6 +1390,7 @@ class FileChangeFilter(watchfiles.DefaultFilter):
     def __init__(self, ignore_file_patterns: Sequence[str], *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.ignore_file_patterns = ignore_file_patterns
+        self._ignore_matcher = FilenameMatcher(ignore_file_patterns)
 
     def __call__(self, change: watchfiles.Change, path: str) -> bool:
         """Returns `True` if a file should be watched for changes. The `IGNORE_FILES`
@@ -855,8 +1399,8 @@ class FileChangeFilter(watchfiles.DefaultFilter):
         filters of `watchfiles.DefaultFilter`, seen here:
         https://watchfiles.helpmanual.io/api/filters/#watchfiles.DefaultFilter.ignore_dirs
         """
-        return super().__call__(change, path) and not any(
-            fnmatch.fnmatch(os.path.abspath(path), p) for p in self.ignore_file_patterns
+        return super().__call__(change, path) and not self._ignore_matcher.matches(
+            os.path.abspath(path)
         )
 
 
@@ -996,3 +1540,22 @@ def file_suffix(path: str) -> str:
         # drop the ".", e.g., "exe", not ".exe"
         ret = ext[1:]
     return ret
+
+
+def get_worker_count(workers: int, tasks: int) -> int:
+    """Return the number of worker processes to fork for some tasks.
+
+    A workers value of 0 means one process per CPU. 1 is returned, meaning
+    that the tasks should be run in the current process, if there is at most
+    one task or if the 'fork' start method is not available.
+    """
+    if not workers:
+        workers = os.cpu_count() or 1
+    workers = min(workers, tasks)
+    if workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        logger.warning(
+            "Parallel processing requires the 'fork' start method, which is "
+            "not available on this platform. Running serially."
+        )
+        return 1
+    return max(workers, 1)
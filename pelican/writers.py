@@ -1,18 +1,30 @@
+import contextlib
+import filecmp
+import io
 import logging
+import multiprocessing
 import os
+import pickle
 from posixpath import join as posix_join
 from urllib.parse import urljoin
 
 from feedgenerator import Atom1Feed, Rss201rev2Feed, get_tag_uri
 from markupsafe import Markup
 
+from pelican import profiling
+from pelican.cache import BuildManifest
+from pelican.contents import Content
+from pelican.log import init_worker_logging, replay_log_records
 from pelican.paginator import Paginator
 from pelican.plugins import signals
 from pelican.utils import (
+    OutputCompressor,
     get_relative_path,
+    get_worker_count,
     path_to_url,
     sanitised_join,
     set_date_tzinfo,
+    unlink_if_linked,
 )
 
 logger = logging.getLogger(__name__)
@@ -23,12 +35,39 @@ class FileOverwriteFailedError(RuntimeError):
 
 
 class Writer:
-    def __init__(self, output_path, settings=None):
+    # template variables listing the whole site, of which the content is not
+    # rendered (see BuildManifest.get_signature)
+    _listing_kwargs = frozenset(("all_articles",))
+
+    def __init__(self, output_path, settings=None, memory_caches=None):
+        """*memory_caches* is the dictionary in which the build manifest is
+        kept between the builds of a process (see WARM_REBUILD), if any."""
         self.output_path = output_path
         self.reminder = {}
         self.settings = settings or {}
         self._written_files = set()
         self._overridden_files = set()
+        # numbers of output files written, and left untouched because
+        # unchanged
+        self.files_written = 0
+        self.files_unchanged = 0
+        # files rendered by this build (whether or not they were changed)
+        self._rendered_files = set()
+        self._compressor = OutputCompressor(self.settings)
+        # the signatures of the inputs of the output files are only computed
+        # if they are compared with those of the previous build
+        self._signatures = bool(
+            self.settings.get("INCREMENTAL_BUILD") or memory_caches is not None
+        )
+        if self._signatures or self.settings.get("SKIP_UNCHANGED_OUTPUT"):
+            self._manifest = BuildManifest(
+                self.settings, memory_caches, output_path=output_path
+            )
+        else:
+            self._manifest = None
+        # writes of files overridden by the previous build, waiting for the
+        # overriding write (see _write_file)
+        self._deferred = {}
 
         # See Content._link_replacer for details
         if self.settings.get("RELATIVE_URLS"):
@@ -103,12 +142,23 @@ class Writer:
             else None,
         )
 
-    def _open_w(self, filename, encoding, override=False):
+    def _open_w(self, filename, encoding, override=False, signature=None):
         """Open a file to write some content to it.
 
         Exit if we have already written to that file, unless one (and no more
         than one) of the writes has the override parameter set to True.
         """
+        filename = self._register_output(filename, override, signature)
+        unlink_if_linked(filename)
+        return open(filename, "w", encoding=encoding)
+
+    def _register_output(self, filename, override=False, signature=None):
+        """Record that a file is about to be written, and return the name of
+        the file to actually write to (os.devnull if it must be skipped).
+
+        See _open_w() for the overwrite rules. signature is the signature of
+        the inputs of the file, saved in the build manifest.
+        """
         if filename in self._overridden_files:
             if override:
                 raise FileOverwriteFailedError(
@@ -128,7 +178,121 @@ class Writer:
         if override:
             self._overridden_files.add(filename)
         self._written_files.add(filename)
-        return open(filename, "w", encoding=encoding)
+        if self._manifest is not None and filename != os.devnull:
+            self._manifest.cache_data(filename, (signature, override))
+        return filename
+
+    def _write_output(self, filename, output):
+        """Write the output text to a file, and return True.
+
+        If SKIP_UNCHANGED_OUTPUT is True and the file already holds that
+        output, leave it untouched and return False instead. The compressed
+        copies of the file (see OUTPUT_PRECOMPRESS) are written from the
+        output, unless they are up to date.
+        """
+        if os.linesep != "\n":
+            output = output.replace("\n", os.linesep)
+        data = output.encode("utf-8")
+        if filename == os.devnull:
+            return True
+        if self.settings.get("SKIP_UNCHANGED_OUTPUT") and _file_holds(filename, data):
+            self._compressor.compress(filename, data, changed=False)
+            return False
+        unlink_if_linked(filename)
+        with open(filename, "wb") as f:
+            f.write(data)
+        profiling.count("bytes_written", len(data))
+        self._compressor.compress(filename, data)
+        return True
+
+    def _stream_output(self, filename, chunks):
+        """Write the output text, given as an iterable of strings, to a
+        temporary file renamed to filename once complete, so that the file is
+        never seen partially written. Return True, or False if it was left
+        untouched (see _write_output).
+        """
+        dirname, basename = os.path.split(filename)
+        temp_filename = os.path.join(dirname, f".{basename}.{os.getpid()}.tmp")
+        try:
+            # the newlines are written as os.linesep, as by _write_output()
+            with open(temp_filename, "w", encoding="utf-8") as f:
+                f.writelines(chunks)
+            if self.settings.get("SKIP_UNCHANGED_OUTPUT") and _files_equal(
+                temp_filename, filename
+            ):
+                os.unlink(temp_filename)
+                self._compressor.compress(filename, changed=False)
+                return False
+            os.replace(temp_filename, filename)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_filename)
+            raise
+        profiling.count("bytes_written", os.path.getsize(filename))
+        self._compressor.compress(filename)
+        return True
+
+    def _render_output(self, template, localcontext, filename):
+        """Render the template to the file, streaming the output if
+        STREAM_OUTPUT is True. Return whether the file was written (see
+        _write_output)."""
+        with profiling.timer("templates", template.name):
+            if self.settings.get("STREAM_OUTPUT") and filename != os.devnull:
+                return self._stream_output(filename, template.generate(localcontext))
+            output = template.render(localcontext)
+        return self._write_output(filename, output)
+
+    def _output_done(self, path, written, filename=None):
+        """Log and count an output file, written or left untouched."""
+        if written:
+            logger.info('Writing "%s"', path)
+            if filename != os.devnull:
+                self.files_written += 1
+                profiling.count("files_written")
+        else:
+            logger.debug('Skipping "%s", unchanged', path)
+            self.files_unchanged += 1
+            profiling.count("files_unchanged")
+
+    def _is_unchanged(self, filename, signature):
+        """Return True if the file was written by the previous build from the
+        same inputs, and so does not need to be written again.
+
+        When a file is written several times, only the signature of the last
+        write is kept, so an overriding write can only be skipped if the file
+        was not rendered yet by this build.
+        """
+        return (
+            self._manifest is not None
+            and filename not in self._rendered_files
+            and self._manifest.is_up_to_date(filename, signature)
+        )
+
+    @staticmethod
+    def _resolve_links(localcontext):
+        """Resolve the links of the content of a file that is not rendered
+        right away: {attach} links change the output paths of static files,
+        which the StaticGenerator needs."""
+        for key in ("article", "page"):
+            content = localcontext.get(key)
+            if isinstance(content, Content):
+                content.get_content(content.get_siteurl())
+
+    def flush(self):
+        """Finish writing the output, once all the generators are done."""
+        # the deferred writes that were not overridden this time
+        for path, (template, context, localcontext) in self._deferred.items():
+            if localcontext["localsiteurl"]:
+                context["localsiteurl"] = localcontext["localsiteurl"]
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._rendered_files.add(path)
+            written = self._render_output(template, localcontext, path)
+            self._output_done(path, written)
+            signals.content_written.send(path, context=localcontext)
+        self._deferred = {}
+        self._compressor.wait()
+        if self._manifest is not None:
+            self._manifest.save_cache()
 
     def write_feed(
         self,
@@ -143,7 +307,9 @@ class Writer:
         """Generate a feed with the list of articles provided
 
         Return the feed. If no path or output_path is specified, just
-        return the feed object.
+        return the feed object. Return None if the feed is unchanged since
+        the previous build, and therefore neither generated nor written (see
+        INCREMENTAL_BUILD and SKIP_UNCHANGED_OUTPUT).
 
         :param elements: the articles to put on the feed.
         :param context: the context to get the feed metadata.
@@ -156,6 +322,26 @@ class Writer:
             name should be skipped to keep that one)
         :param feed_title: the title of the feed.o
         """
+        signature = None
+        if path and self._signatures:
+            complete_path = sanitised_join(self.output_path, path)
+            signature = self._manifest.get_signature(
+                None,
+                context,
+                {
+                    "elements": elements,
+                    "path": path,
+                    "url": url,
+                    "feed_type": feed_type,
+                    "feed_title": feed_title,
+                },
+            )
+            if self._is_unchanged(complete_path, signature):
+                self._register_output(complete_path, override_output, signature)
+                self._output_done(complete_path, written=False)
+                self._compressor.compress(complete_path, changed=False)
+                return None
+
         self.site_url = context.get("SITEURL", path_to_url(get_relative_path(path)))
 
         self.feed_domain = context.get("FEED_DOMAIN")
@@ -173,13 +359,58 @@ class Writer:
 
             os.makedirs(os.path.dirname(complete_path), exist_ok=True)
 
-            with self._open_w(complete_path, "utf-8", override_output) as fp:
-                feed.write(fp, "utf-8")
-                logger.info('Writing "%s"', complete_path)
+            output = io.StringIO()
+            feed.write(output, "utf-8")
+            filename = self._register_output(complete_path, override_output, signature)
+            self._rendered_files.add(complete_path)
+            written = self._write_output(filename, output.getvalue())
+            self._output_done(complete_path, written, filename)
 
             signals.feed_written.send(complete_path, context=context, feed=feed)
         return feed
 
+    def _write_file(
+        self, template, context, localcontext, name, override, signature=None
+    ):
+        """Render the template and write the file."""
+        # set localsiteurl for context so that Contents can adjust links
+        if localcontext["localsiteurl"]:
+            context["localsiteurl"] = localcontext["localsiteurl"]
+        path = sanitised_join(self.output_path, name)
+        if (
+            not override
+            and self._manifest is not None
+            and path not in self._written_files
+            and self._manifest.was_overridden(path)
+        ):
+            # The file is likely to be overridden again: the write is only
+            # done by flush() if it is not, so that the file is not changed
+            # twice by every build.
+            self._resolve_links(localcontext)
+            self._register_output(path, override, signature)
+            self._deferred[path] = (template, context, localcontext)
+            return
+        unchanged = self._is_unchanged(path, signature)
+        overridden = self._deferred.pop(path, None)
+        if overridden is not None:
+            signals.content_written.send(path, context=overridden[2])
+        if unchanged:
+            self._resolve_links(localcontext)
+            self._register_output(path, override, signature)
+            self._output_done(path, written=False)
+            self._compressor.compress(path, changed=False)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            filename = self._register_output(path, override, signature)
+            self._rendered_files.add(path)
+            written = self._render_output(template, localcontext, filename)
+            self._output_done(path, written, filename)
+
+        # Send a signal to say we're writing a file with some specific
+        # local context.
+        signals.content_written.send(path, context=localcontext)
+
     def write_file(
         self,
         name,
@@ -214,24 +445,6 @@ class Writer:
             # other stuff, just return for now
             return
 
-        def _write_file(template, localcontext, output_path, name, override):
-            """Render the template write the file."""
-            # set localsiteurl for context so that Contents can adjust links
-            if localcontext["localsiteurl"]:
-                context["localsiteurl"] = localcontext["localsiteurl"]
-            output = template.render(localcontext)
-            path = sanitised_join(output_path, name)
-
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-
-            with self._open_w(path, "utf-8", override=override) as f:
-                f.write(output)
-            logger.info('Writing "%s"', path)
-
-            # Send a signal to say we're writing a file with some specific
-            # local context.
-            signals.content_written.send(path, context=localcontext)
-
         def _get_localcontext(context, name, kwargs, relative_urls):
             localcontext = context.copy()
             localcontext["localsiteurl"] = localcontext.get("localsiteurl", None)
@@ -243,6 +456,32 @@ class Writer:
             localcontext.update(kwargs)
             return localcontext
 
+        signature = None
+        if self._signatures:
+            # All the pages of a paginated output share the same signature:
+            # the manifest keeps a signature per output path.
+            signature = self._manifest.get_signature(
+                template,
+                context,
+                {
+                    "name": name,
+                    "relative_urls": relative_urls,
+                    "paginated": paginated,
+                    "template_name": template_name,
+                    "url": url,
+                    "kwargs": {
+                        key: value
+                        for key, value in kwargs.items()
+                        if key not in self._listing_kwargs
+                    },
+                },
+                listings={
+                    key: value
+                    for key, value in kwargs.items()
+                    if key in self._listing_kwargs
+                },
+            )
+
         if paginated is None:
             paginated = {
                 key: val for key, val in kwargs.items() if key in {"articles", "dates"}
@@ -285,14 +524,175 @@ class Writer:
                 localcontext = _get_localcontext(
                     context, page.save_as, paginated_kwargs, relative_urls
                 )
-                _write_file(
+                self._write_file(
                     template,
+                    context,
                     localcontext,
-                    self.output_path,
                     page.save_as,
                     override_output,
+                    signature,
                 )
         else:
             # no pagination
             localcontext = _get_localcontext(context, name, kwargs, relative_urls)
-            _write_file(template, localcontext, self.output_path, name, override_output)
+            self._write_file(
+                template, context, localcontext, name, override_output, signature
+            )
+
+
+def _file_holds(filename, data):
+    """Return True if the file exists and holds the given bytes."""
+    try:
+        if os.path.getsize(filename) != len(data):
+            return False
+        with open(filename, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def _files_equal(filename, other):
+    """Return True if both files exist and have the same content."""
+    try:
+        return filecmp.cmp(filename, other, shallow=False)
+    except OSError:
+        return False
+
+
+class ParallelWriter(Writer):
+    """Writer rendering the templates in several processes.
+
+    write_file() only queues the files; they are rendered and written by
+    WRITER_WORKERS forked processes when flush() is called, once all the
+    generators are done. The overwrite rules are enforced, and the
+    content_written signals sent, in the main process and in the order of
+    the write_file() calls.
+    """
+
+    def __init__(self, output_path, settings=None, memory_caches=None):
+        super().__init__(output_path, settings=settings, memory_caches=memory_caches)
+        self._jobs = []
+        self._targets = {}
+
+    def _write_file(
+        self, template, context, localcontext, name, override, signature=None
+    ):
+        """Queue the file for rendering."""
+        # set localsiteurl for context so that Contents can adjust links
+        if localcontext["localsiteurl"]:
+            context["localsiteurl"] = localcontext["localsiteurl"]
+        self._resolve_links(localcontext)
+
+        path = sanitised_join(self.output_path, name)
+        unchanged = self._is_unchanged(path, signature)
+        if self._register_output(path, override, signature) != os.devnull:
+            # the last write of a file (i.e. the overriding one) wins
+            if unchanged:
+                self._targets.pop(path, None)
+            else:
+                self._targets[path] = len(self._jobs)
+
+        # Only keep what differs from the shared context, to save memory.
+        local = {
+            key: value
+            for key, value in localcontext.items()
+            if key not in context or context[key] is not value
+        }
+        local["localsiteurl"] = localcontext["localsiteurl"]
+        self._jobs.append((template, context, local, path, unchanged))
+
+    def _render_job(self, index):
+        """Render and write a queued file, unless it was overridden.
+
+        Return whether the file was written (see Writer._write_output), or
+        None if it was not rendered.
+        """
+        template, context, local, path, _ = self._jobs[index]
+        if self._targets.get(path) != index:
+            return None
+        localcontext = {**context, **local}
+        if localcontext["localsiteurl"]:
+            context["localsiteurl"] = localcontext["localsiteurl"]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        return self._render_output(template, localcontext, path)
+
+    def _job_done(self, index, written):
+        _, context, local, path, unchanged = self._jobs[index]
+        if unchanged or written is not None:
+            self._output_done(path, written)
+        if unchanged:
+            self._compressor.compress(path, changed=False)
+
+        # Send a signal to say we're writing a file with some specific
+        # local context.
+        signals.content_written.send(path, context={**context, **local})
+
+    def flush(self):
+        """Render and write all the queued files."""
+        workers = get_worker_count(
+            self.settings.get("WRITER_WORKERS", 1), len(self._jobs)
+        )
+        try:
+            if workers == 1:
+                for index in range(len(self._jobs)):
+                    self._job_done(index, self._render_job(index))
+            else:
+                self._render_jobs_in_pool(workers)
+        finally:
+            self._jobs = []
+            self._targets = {}
+        super().flush()
+
+    def _render_jobs_in_pool(self, workers):
+        # no compression thread must be running when the workers are forked
+        self._compressor.wait()
+        chunksize = max(1, len(self._jobs) // (workers * 4))
+        pool_context = multiprocessing.get_context("fork")
+        with pool_context.Pool(
+            workers, initializer=_init_writer_worker, initargs=(self,)
+        ) as pool:
+            outputs = pool.imap(
+                _render_in_worker, range(len(self._jobs)), chunksize=chunksize
+            )
+            for index, output in enumerate(outputs):
+                records, profile, error, written = pickle.loads(output)
+                replay_log_records(records)
+                profiling.merge(profile)
+                if error is not None:
+                    raise error
+                self._job_done(index, written)
+
+
+_worker_writer = None
+_worker_log_collector = None
+
+
+def _init_writer_worker(writer):
+    """Set up a forked writer worker process."""
+    global _worker_writer, _worker_log_collector  # noqa: PLW0603
+    _worker_writer = writer
+    # the worker processes are the pool compressing the files they write
+    writer._compressor = OutputCompressor(writer.settings, threaded=False)
+    _worker_log_collector = init_worker_logging()
+
+
+def _render_in_worker(index):
+    """Render a queued file in a writer worker process.
+
+    Return the pickled log records, profile (see pelican.profiling),
+    exception if any, and result of ParallelWriter._render_job().
+    """
+    _worker_log_collector.records = []
+    error = written = None
+    with profiling.collecting() as profile:
+        try:
+            written = _worker_writer._render_job(index)
+        except Exception as err:  # noqa: BLE001
+            error = err
+
+    try:
+        return pickle.dumps((_worker_log_collector.records, profile, error, written))
+    except Exception:  # noqa: BLE001
+        error = RuntimeError(f"{error.__class__.__name__}: {error}")
+        return pickle.dumps((_worker_log_collector.records, profile, error, written))